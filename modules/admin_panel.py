@@ -6,33 +6,18 @@ function is invoked from ``app.py`` to display the UI.
 """
 
 import streamlit as st
-import bcrypt
 import pandas as pd
 from auth import signup
+from modules.db_tools.filters import clear_building_cache
 from modules.db_tools.crud_operations import (
     get_all_users, get_all_buildings, get_user_building_ids,
     update_user_buildings, update_user, delete_user,
     get_user_id, get_user_session_count, count_active_users,
     get_active_users, get_db_activity, terminate_connection,
     get_open_support_tickets, update_support_ticket_status,
-    delete_support_ticket
+    delete_support_ticket, hash_password, get_last_logins
 )
 
-# Optional: implement this in crud_operations.py
-def get_last_logins(conn, user_id, limit=5):
-    """Return recent login timestamps for the given user."""
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            SELECT login_time FROM user_sessions
-            WHERE user_id = %s
-            ORDER BY login_time DESC
-            LIMIT %s;
-        """,
-            (user_id, limit),
-        )
-        return [r[0].strftime("%Y-%m-%d %H:%M") for r in cur.fetchall()]
-
 
 def render(conn, T):
     """Render the admin panel using the provided translator."""
@@ -113,7 +98,7 @@ def render(conn, T):
             st.rerun()
 
         if col2.button(T("reset_password")) and new_password:
-            hashed = bcrypt.hashpw(new_password.encode(), bcrypt.gensalt()).decode()
+            hashed = hash_password(new_password)
             with conn.cursor() as cur:
                 cur.execute(
                     "UPDATE users SET password_hash = %s WHERE user_id = %s;",
@@ -174,7 +159,7 @@ def render(conn, T):
     with st.expander("🏢 " + T("assign_buildings_to_user")):
         selected_user_row = users_df[users_df["username"] == st.selectbox("👤 " + T("select_user"), users_df["username"], key="assign_user")]
         user_id = int(selected_user_row["user_id"])
-        current_ids = get_user_building_ids(conn, user_id)
+        current_ids = sorted(get_user_building_ids(conn, user_id))
 
         building_names = buildings_df.set_index("building_id")["building_name"].to_dict()
         building_id_options = list(building_names.keys())
@@ -191,6 +176,7 @@ def render(conn, T):
 
         if st.button(T("save_assignments")):
             update_user_buildings(conn, user_id, selected_buildings)
+            clear_building_cache()
             st.success(T("assignments_updated"))
             st.rerun()
 
@@ -1,8 +1,13 @@
 """User authentication helpers."""
-import bcrypt
 import streamlit as st
 
-from modules.db_tools.crud_operations import create_user, get_user_by_username
+from modules.db_tools.crud_operations import (
+    create_user,
+    get_user_by_username,
+    hash_password,
+    password_needs_rehash,
+    verify_password,
+)
 from modules.utils.localization import get_translation
 import time
 
@@ -42,7 +47,7 @@ def login(conn):
 
     if st.button(T("login_btn")):
         user = get_user_by_username(conn, username)
-        if user and bcrypt.checkpw(password.encode(), user[2].encode()):
+        if user and verify_password(password, user[2]):
             # If this is the first login, trigger onboarding wizard
             first_login_flag = False
             if user[7]is None:
@@ -71,6 +76,13 @@ def login(conn):
                     VALUES (%s)
                 """, (user_id,))
 
+                # Upgrade legacy bcrypt hashes now that the password is known
+                if password_needs_rehash(user[2]):
+                    cur.execute(
+                        "UPDATE users SET password_hash = %s WHERE user_id = %s",
+                        (hash_password(password), user_id),
+                    )
+
                 conn.commit()
 
             st.success(T("welcome_user").format(username=username))
@@ -9,8 +9,7 @@ import streamlit as st
 import datetime
 import pandas as pd
 from modules.db_tools.crud_operations import (
-    get_user_id,
-    get_user_role,
+    get_user_auth_bundle,
     get_buildings_by_user,
     get_residents_by_building_full,
     get_apartments_by_building,
@@ -22,14 +21,16 @@ from modules.db_tools.crud_operations import (
     upsert_bulk_apartment_fees,
     deactivate_resident,
 )
+from modules.db_tools.filters import clear_building_cache
 from modules.utils.email_utils import send_invoice_email
 
 def render(conn, T):
     """Display the buildings dashboard and related management tools."""
     st.header(T("buildings"))
 
-    user_id = get_user_id(conn, st.session_state.username)
-    user_role = get_user_role(conn, st.session_state.username)
+    auth = get_user_auth_bundle(conn, st.session_state.username)
+    user_id = auth.user_id if auth else None
+    user_role = auth.role if auth else "user"
     df_buildings = get_buildings_by_user(conn, user_id, user_role)
 
     if df_buildings.empty:
@@ -299,6 +300,7 @@ def render(conn, T):
                 new_contact_phone,
                 new_contact_email,
             )
+            clear_building_cache()
             st.success(T("building_updated"))
             st.rerun()
 
@@ -312,6 +314,7 @@ def render(conn, T):
 
             if submitted:
                 add_building(conn, name, city, street, home_number)
+                clear_building_cache()
                 st.success(T("building_added"))
                 st.rerun()
 
@@ -397,5 +400,6 @@ def render(conn, T):
         )
         if st.button(T("delete_building_btn"), key="delete_building_btn"):
             delete_building(conn, building_id)
+            clear_building_cache()
             st.success(T('building_deleted').format(building=building_options[building_id]))
             st.rerun()
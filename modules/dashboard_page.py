@@ -4,7 +4,7 @@ import streamlit as st
 import datetime
 import pandas as pd
 import plotly.graph_objects as go
-from modules.gpt_assistant import ask_gpt
+from modules.gpt_assistant import ask_gpt_stream
 from modules.db_tools.crud_operations import (
     get_buildings,
     get_financial_summary_range,
@@ -89,9 +89,7 @@ def render(conn, T):
                 "user": username,
                 "role": st.session_state.get("role"),
             }
-            with st.spinner(T("thinking")):
-                answer = ask_gpt(user_q, ctx)
-            st.write(answer)
+            st.write_stream(ask_gpt_stream(user_q, ctx))
 
     # Checkbox for special transactions
     st.divider()
@@ -1,7 +1,18 @@
 """Database CRUD operation utilities."""
+from collections import namedtuple
+from dataclasses import dataclass
+
 import pandas as pd
 import bcrypt
 import streamlit as st
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from psycopg2.extras import RealDictCursor, execute_values
+
+
+# Argon2id parameters for new password hashes. Existing bcrypt hashes are
+# still accepted at login and upgraded on the next successful sign-in.
+PASSWORD_HASHER = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=2)
 
 
 def get_buildings(conn):
@@ -233,13 +244,74 @@ def get_financial_summary_range(conn, start_date, end_date, building_id=None, ex
     return pd.read_sql(query, conn, params=params)
 
 
+def get_monthly_financial_summary(conn, start_date, end_date, building_id=None):
+    """Summarize expected and paid income per month for a date range.
 
-def get_expense_details_range(conn, start_date, end_date, building_id=None):
+    Returns one row per month with activity. Totals are given both with and
+    without the "apartment 0" placeholder (``exclude0_*`` columns), so either
+    view comes from the same query.
+    """
+    query = """
+        WITH expected AS (
+            SELECT date_trunc('month', ec.charge_month)::date AS month,
+                   SUM(ec.expected_amount) AS total_expected,
+                   SUM(ec.expected_amount) FILTER (
+                       WHERE ec.apartment_id != 0 AND ea.apartment_number <> '0'
+                   ) AS exclude0_expected
+            FROM expected_charges ec
+            LEFT JOIN apartments ea ON ec.apartment_id = ea.apartment_id
+            WHERE ec.charge_month BETWEEN %s AND %s
+              AND (%s IS NULL OR ec.building_id = %s)
+            GROUP BY 1
+        ),
+        paid AS (
+            SELECT date_trunc('month', t.charge_month)::date AS month,
+                   SUM(t.amount_paid) AS total_paid,
+                   SUM(t.amount_paid) FILTER (
+                       WHERE t.apartment_id != 0 AND ta.apartment_number <> '0'
+                   ) AS exclude0_paid
+            FROM transactions t
+            LEFT JOIN apartments ta ON t.apartment_id = ta.apartment_id
+            WHERE t.charge_month BETWEEN %s AND %s
+              AND (%s IS NULL OR t.building_id = %s)
+            GROUP BY 1
+        )
+        SELECT month,
+               COALESCE(total_expected, 0) AS total_expected,
+               COALESCE(exclude0_expected, 0) AS exclude0_expected,
+               COALESCE(total_paid, 0) AS total_paid,
+               COALESCE(exclude0_paid, 0) AS exclude0_paid
+        FROM expected
+        FULL JOIN paid USING (month)
+        ORDER BY month;
+    """
+
+    params = [
+        start_date, end_date, building_id, building_id,     # expected
+        start_date, end_date, building_id, building_id,     # paid
+    ]
+
+    return pd.read_sql(query, conn, params=params)
+
+
+def get_expense_details_range(
+    conn,
+    start_date,
+    end_date,
+    building_id=None,
+    year=None,
+    month=None,
+    expense_type=None,
+    status=None,
+):
     """Retrieve detailed expenses for a date range.
 
     In addition to the monthly payment details used on the dashboard, this
     function now returns the original expense metadata so the expenses page can
     display the full set of columns.
+
+    ``year``, ``month``, ``expense_type`` and ``status`` are optional extra
+    filters applied in SQL when given.
     """
     query = """
         SELECT p.charge_year,
@@ -268,8 +340,40 @@ def get_expense_details_range(conn, start_date, end_date, building_id=None):
     if building_id:
         query += " AND e.building_id = %s"
         params.append(building_id)
+    if year is not None:
+        query += " AND p.charge_year = %s"
+        params.append(year)
+    if month is not None:
+        query += " AND p.charge_month_num = %s"
+        params.append(month)
+    if expense_type is not None:
+        query += " AND p.expense_type = %s"
+        params.append(expense_type)
+    if status is not None:
+        query += " AND e.status = %s"
+        params.append(status)
+
+    return pd.read_sql(query, conn, params=params)
+
 
+def get_monthly_expense_totals(conn, start_date, end_date, building_id=None):
+    """Sum paid and pending expense payments per month for a date range."""
+    query = """
+        SELECT date_trunc('month', p.charge_month)::date AS month,
+               COALESCE(SUM(p.cost) FILTER (WHERE e.status = 'paid'), 0) AS expenses_paid,
+               COALESCE(SUM(p.cost) FILTER (WHERE e.status = 'pending'), 0) AS expenses_pending
+        FROM payments p
+        JOIN expenses e ON p.expense_id = e.expense_id
+        WHERE p.charge_month BETWEEN %s AND %s
+          AND (%s IS NULL OR e.building_id = %s)
+        GROUP BY 1
+        ORDER BY 1;
+    """
+
+    params = [start_date, end_date, building_id, building_id]
     return pd.read_sql(query, conn, params=params)
+
+
 def insert_bulk_transactions(conn, building_id, records, payment_date, method):
     """Bulk insert transaction records."""
     """
@@ -340,63 +444,71 @@ def import_expenses_from_df(conn, df):
     if not required_cols.issubset(df.columns):
         raise ValueError("missing_columns")
 
-    inserted = 0
-    skipped = []
-
-    with conn.cursor() as cur:
-        for _, row in df.iterrows():
-            try:
-                building_id = int(row["building_id"])
-                supplier_id = int(row["supplier_id"])
-                receipt_id = str(row.get("supplier_receipt_id", ""))
-                start_date = pd.to_datetime(
-                    str(row["start_date"]).strip(),
-                    format="%d/%m/%Y",
-                    dayfirst=True,
-                ).date()
-                num_payments = int(row.get("num_payments", 1))
-                total_cost = float(row.get("total_cost", 0))
-                status = str(row.get("status", "pending"))
-                notes = str(row.get("notes", ""))
-
-                if num_payments <= 0:
-                    raise ValueError("invalid_payments")
-            except Exception:
-                skipped.append((receipt_id, row.get("start_date"), "invalid_data"))
-                continue
+    # Parse and validate whole columns at once; invalid rows are reported
+    building_ids = pd.to_numeric(df["building_id"], errors="coerce")
+    supplier_ids = pd.to_numeric(df["supplier_id"], errors="coerce")
+    num_payments = pd.to_numeric(df["num_payments"], errors="coerce")
+    total_costs = pd.to_numeric(df["total_cost"], errors="coerce")
+    start_dates = pd.to_datetime(
+        df["start_date"].astype(str).str.strip(),
+        format="%d/%m/%Y",
+        errors="coerce",
+    )
+    receipt_ids = df["supplier_receipt_id"].astype(str)
+    statuses = df["status"].astype(str)
+    notes = df["notes"].astype(str) if "notes" in df.columns else pd.Series("", index=df.index)
+
+    valid = (
+        building_ids.notna()
+        & supplier_ids.notna()
+        & start_dates.notna()
+        & total_costs.notna()
+        & (num_payments >= 1)
+    )
+    skipped = [
+        (receipt, s_date, "invalid_data")
+        for receipt, s_date in zip(receipt_ids[~valid], df.loc[~valid, "start_date"])
+    ]
 
-            end_date = (
-                pd.to_datetime(start_date)
-                + pd.DateOffset(months=num_payments - 1)
-                + pd.offsets.MonthEnd(0)
-            ).date()
-            monthly_cost = total_cost / num_payments
-
-            cur.execute(
-                """
-                INSERT INTO expenses (
-                    building_id, supplier_id, supplier_receipt_id,
-                    start_date, end_date, total_cost, monthly_cost,
-                    num_payments, status, notes
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """,
-                (
-                    building_id,
-                    supplier_id,
-                    receipt_id,
-                    start_date,
-                    end_date,
-                    total_cost,
-                    monthly_cost,
-                    num_payments,
-                    status,
-                    notes,
-                ),
-            )
-            inserted += 1
+    if not valid.any():
+        return 0, skipped
+
+    start_ok = start_dates[valid]
+    payments_ok = num_payments[valid].astype(int)
+    costs_ok = total_costs[valid].astype(float)
+    # end date = last day of the month holding the final payment
+    last_month = start_ok.dt.year * 12 + start_ok.dt.month - 1 + payments_ok - 1
+    end_dates = pd.to_datetime(
+        pd.DataFrame({"year": last_month // 12, "month": last_month % 12 + 1, "day": 1})
+    ) + pd.offsets.MonthEnd(0)
+
+    rows = list(zip(
+        building_ids[valid].astype(int).tolist(),
+        supplier_ids[valid].astype(int).tolist(),
+        receipt_ids[valid].tolist(),
+        start_ok.dt.date.tolist(),
+        end_dates.dt.date.tolist(),
+        costs_ok.tolist(),
+        (costs_ok / payments_ok).tolist(),
+        payments_ok.tolist(),
+        statuses[valid].tolist(),
+        notes[valid].tolist(),
+    ))
 
+    with conn.cursor() as cur:
+        execute_values(
+            cur,
+            """
+            INSERT INTO expenses (
+                building_id, supplier_id, supplier_receipt_id,
+                start_date, end_date, total_cost, monthly_cost,
+                num_payments, status, notes
+            ) VALUES %s
+            """,
+            rows,
+        )
     conn.commit()
-    return inserted, skipped
+    return len(rows), skipped
 
 
 def import_transactions_from_df(conn, df):
@@ -594,6 +706,22 @@ def get_residents_by_building_full(conn, building_id, active_only=False):
     return pd.read_sql(query, conn, params=params)
 
 
+def get_residents_summary(conn, building_id):
+    """Return a compact resident listing for a building.
+
+    Only the summary columns are selected, ordered by apartment number
+    zero-padded to four digits like the rest of the UI sorts it.
+    """
+    query = """
+        SELECT a.apartment_number, r.first_name, r.last_name, r.role, r.is_active
+        FROM residents r
+        JOIN apartments a ON r.apartment_id = a.apartment_id
+        WHERE a.building_id = %s
+        ORDER BY lpad(a.apartment_number::text, 4, '0'), r.role
+    """
+    return pd.read_sql(query, conn, params=(int(building_id),))
+
+
 def set_active_resident(conn, resident_id, apartment_id):
     """Set the active resident for an apartment."""
     with conn.cursor() as cur:
@@ -815,6 +943,53 @@ def get_expenses(conn):
     return pd.read_sql(query, conn)
 
 
+def get_expenses_by_building(conn, building_id):
+    """Retrieve the expenses of a single building.
+
+    Same columns as ``get_expenses``; the building filter runs in SQL so
+    only that building's rows are transferred.
+    """
+    query = """
+        SELECT e.expense_id, b.building_name, b.building_id, s.supplier_name,
+               e.supplier_id,
+               e.supplier_receipt_id, e.start_date, e.end_date,
+               e.total_cost, e.monthly_cost, e.num_payments,
+               e.expense_type, e.status, e.notes
+        FROM expenses e
+        JOIN suppliers s ON e.supplier_id = s.supplier_id
+        JOIN buildings b ON e.building_id = b.building_id
+        WHERE e.building_id = %s
+        ORDER BY e.start_date DESC;
+    """
+    return pd.read_sql(query, conn, params=(int(building_id),))
+
+
+def get_expenses_with_doc_counts(conn):
+    """Retrieve all expenses with the number of attached documents.
+
+    Same columns as ``get_expenses`` plus ``doc_count``; counts are
+    aggregated in the database so no separate query or merge is needed.
+    """
+    query = """
+        SELECT e.expense_id, b.building_name, b.building_id, s.supplier_name,
+               e.supplier_id,
+               e.supplier_receipt_id, e.start_date, e.end_date,
+               e.total_cost, e.monthly_cost, e.num_payments,
+               e.expense_type, e.status, e.notes,
+               COALESCE(d.doc_count, 0) AS doc_count
+        FROM expenses e
+        JOIN suppliers s ON e.supplier_id = s.supplier_id
+        JOIN buildings b ON e.building_id = b.building_id
+        LEFT JOIN (
+            SELECT expense_id, COUNT(*) AS doc_count
+            FROM expense_documents
+            GROUP BY expense_id
+        ) d ON d.expense_id = e.expense_id
+        ORDER BY e.start_date DESC;
+    """
+    return pd.read_sql(query, conn)
+
+
 def add_expense(
     conn,
     building_id,
@@ -925,9 +1100,35 @@ def get_expense_document_counts(conn):
 
 
 
+def hash_password(password):
+    """Return an Argon2id hash for ``password``."""
+    return PASSWORD_HASHER.hash(password)
+
+
+def verify_password(password, stored_hash):
+    """Check ``password`` against an Argon2id or legacy bcrypt hash."""
+    if stored_hash.startswith("$argon2"):
+        try:
+            return PASSWORD_HASHER.verify(stored_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return bcrypt.checkpw(password.encode(), stored_hash.encode())
+
+
+def password_needs_rehash(stored_hash):
+    """Return True for bcrypt hashes or Argon2 hashes with stale parameters."""
+    if not stored_hash.startswith("$argon2"):
+        return True
+    return PASSWORD_HASHER.check_needs_rehash(stored_hash)
+
+
 def create_user(conn, username, password, email, role='user'):
-    """Create a new user account."""
-    hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    """Create a new user account.
+
+    The password is hashed before any cursor is opened so the connection is
+    not held while hashing runs.
+    """
+    hashed = hash_password(password)
     with conn.cursor() as cur:
         cur.execute("""
             INSERT INTO users (username, password_hash, email, role)
@@ -956,18 +1157,54 @@ def get_user_role(conn, username):
         result = cur.fetchone()
         return result[0] if result else "user"
 
+
+@dataclass(frozen=True)
+class UserAuth:
+    """Identity fields read together from a single ``users`` row."""
+
+    user_id: int
+    role: str
+    last_active: object = None
+
+    @property
+    def is_first_login(self):
+        """``True`` when the user has never been active."""
+        return self.last_active is None
+
+
+def get_user_auth_bundle(conn, username):
+    """Fetch user id, role and last activity in one round-trip.
+
+    Returns ``None`` when the username does not exist.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT user_id, role, last_active FROM users WHERE username = %s;",
+            (username,),
+        )
+        result = cur.fetchone()
+        if result is None:
+            return None
+        return UserAuth(result[0], result[1] or "user", result[2])
+
 def get_buildings_by_user(conn, user_id, role):
-    """List buildings accessible to a user."""
-    if role == "admin":
-        return get_buildings(conn)
-    else:
-        query = """
-            SELECT b.*
-            FROM buildings b
-            JOIN user_buildings ub ON b.building_id = ub.building_id
-            WHERE ub.user_id = %s;
-        """
-        return pd.read_sql(query, conn, params=(user_id,))
+    """List buildings accessible to a user.
+
+    Admins and regular users share one statement; the admin flag is bound as
+    a parameter so both paths reuse the same plan.
+    """
+    query = """
+        SELECT b.*
+        FROM buildings b
+        WHERE %s
+           OR EXISTS (
+               SELECT 1
+               FROM user_buildings ub
+               WHERE ub.building_id = b.building_id
+                 AND ub.user_id = %s
+           );
+    """
+    return pd.read_sql(query, conn, params=(role == "admin", user_id))
 
 
 def get_all_users(conn):
@@ -984,41 +1221,100 @@ def get_all_buildings(conn):
     """Return basic building info for all buildings."""
     return pd.read_sql("SELECT building_id, building_name FROM buildings ORDER BY building_name;", conn)
 
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_user_building_ids(_conn, user_id):
+    """Cached lookup keyed on ``user_id`` only (the connection is not hashed)."""
+    with _conn.cursor() as cur:
+        cur.execute("""
+            SELECT COALESCE(array_agg(building_id), '{}')
+            FROM user_buildings
+            WHERE user_id = %s;
+        """, (user_id,))
+        return frozenset(cur.fetchone()[0])
+
+
 def get_user_building_ids(conn, user_id):
-    """Get building IDs linked to a user."""
+    """Get building IDs linked to a user as a frozenset."""
+    return _fetch_user_building_ids(conn, int(user_id))  # 👈 Cast here to native int
+
+
+def clear_user_building_ids_cache():
+    """Drop cached ``get_user_building_ids`` results after assignments change."""
+    _fetch_user_building_ids.clear()
+
+
+def get_assigned_buildings(conn, user_id):
+    """Return ``(building_id, building_name, contact_phone, contact_email)``
+    rows for every building assigned to ``user_id``."""
     with conn.cursor() as cur:
         cur.execute("""
-            SELECT building_id FROM user_buildings WHERE user_id = %s;
-        """, (int(user_id),))  # 👈 Cast here to native int
-        return [row[0] for row in cur.fetchall()]
+            SELECT b.building_id, b.building_name, b.contact_phone, b.contact_email
+            FROM buildings b
+            JOIN user_buildings ub USING (building_id)
+            WHERE ub.user_id = %s
+            ORDER BY b.building_id;
+        """, (int(user_id),))
+        return cur.fetchall()
 
 
 def update_user_buildings(conn, user_id, building_ids):
-    """Update building assignments for a user."""
+    """Update building assignments for a user.
+
+    Only the difference between the stored and requested assignments is
+    written, so an unchanged selection costs a single SELECT.
+    """
+    user_id = int(user_id)
+    wanted = {int(b_id) for b_id in building_ids}
     with conn.cursor() as cur:
-        cur.execute("DELETE FROM user_buildings WHERE user_id = %s;", (user_id,))
-        for b_id in building_ids:
-            cur.execute("INSERT INTO user_buildings (user_id, building_id) VALUES (%s, %s);", (user_id, b_id))
+        # Read directly (not via the cache) so the diff is taken in this transaction
+        cur.execute("SELECT building_id FROM user_buildings WHERE user_id = %s;", (user_id,))
+        current = {row[0] for row in cur.fetchall()}
+
+        to_remove = current - wanted
+        to_add = wanted - current
+        if to_remove:
+            cur.execute(
+                "DELETE FROM user_buildings WHERE user_id = %s AND building_id = ANY(%s);",
+                (user_id, sorted(to_remove)),
+            )
+        if to_add:
+            execute_values(
+                cur,
+                "INSERT INTO user_buildings (user_id, building_id) VALUES %s;",
+                [(user_id, b_id) for b_id in sorted(to_add)],
+            )
         conn.commit()
+    clear_user_building_ids_cache()
 
 def get_allowed_suppliers(conn, user_id):
     """List suppliers a user can access."""
     """Returns a DataFrame of suppliers that the user has access to (via expenses -> buildings)."""
-    with conn.cursor() as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("""
-            SELECT DISTINCT s.*
+            SELECT s.*
             FROM suppliers s
-            JOIN expenses e ON s.supplier_id = e.supplier_id
-            JOIN user_buildings ub ON e.building_id = ub.building_id
-            WHERE ub.user_id = %s
+            WHERE EXISTS (
+                SELECT 1
+                FROM expenses e
+                JOIN user_buildings ub ON e.building_id = ub.building_id
+                WHERE e.supplier_id = s.supplier_id
+                  AND ub.user_id = %s
+            )
         """, (user_id,))
-        rows = cur.fetchall()
         cols = [desc[0] for desc in cur.description]
-        return pd.DataFrame(rows, columns=cols)
+        return pd.DataFrame.from_records(cur.fetchall(), columns=cols)
 
 
 def get_paid_transactions(conn, building_id=None, selected_month=None):
-    """Retrieve paid transactions with optional filters."""
+    """Retrieve paid transactions with optional filters.
+
+    ``building_id`` is heavily skewed, so this query is sent as an unnamed
+    statement and planned per call with the real parameter values. If it is
+    ever moved to a named ``PREPARE``, run
+    ``SET LOCAL plan_cache_mode = 'force_custom_plan'`` in the same
+    transaction. Otherwise Postgres switches to a generic plan after five
+    executions and ignores the per-building row estimates.
+    """
     query = """
         SELECT
             t.transaction_id,
@@ -1058,8 +1354,11 @@ def get_paid_transactions(conn, building_id=None, selected_month=None):
         params.append(building_id)
 
     if selected_month is not None:
-        query += " AND DATE_TRUNC('month', t.charge_month) = DATE_TRUNC('month', %s)"
-        params.append(selected_month)
+        # Half-open month range keeps the predicate sargable on charge_month
+        month_start = pd.Timestamp(selected_month).to_period("M").to_timestamp()
+        month_end = month_start + pd.DateOffset(months=1)
+        query += " AND t.charge_month >= %s AND t.charge_month < %s"
+        params += [month_start.date(), month_end.date()]
 
     query += " ORDER BY t.payment_date DESC"
 
@@ -1088,6 +1387,7 @@ def create_invoice(conn, transaction_row):
 
     today = datetime.date.today()
 
+    # Date parts are derived server-side from the two bound dates
     with conn.cursor() as cur:
         cur.execute("""
             INSERT INTO invoices (
@@ -1108,25 +1408,27 @@ def create_invoice(conn, transaction_row):
                 issue_day,
                 payment_method
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            SELECT %s, %s, %s, d.invoice_date, d.issue_date, %s, %s, %s, %s,
+                   EXTRACT(YEAR FROM d.invoice_date),
+                   EXTRACT(MONTH FROM d.invoice_date),
+                   EXTRACT(DAY FROM d.invoice_date),
+                   EXTRACT(YEAR FROM d.issue_date),
+                   EXTRACT(MONTH FROM d.issue_date),
+                   EXTRACT(DAY FROM d.issue_date),
+                   %s
+            FROM (SELECT %s::date AS invoice_date, %s::date AS issue_date) d
             RETURNING invoice_id;
         """, (
             building_id,
             apartment_id,
             resident_id,
-            payment_date,
-            today,
             amount_paid,
             amount_paid,
-            'issued',  # 🟢 was missing from placeholders
+            'issued',
             'Generated from transaction',
-            payment_date.year,
-            payment_date.month,
-            payment_date.day,
-            today.year,
-            today.month,
-            today.day,
             payment_method,
+            payment_date,
+            today,
         ))
 
         invoice_id = cur.fetchone()[0]
@@ -1156,12 +1458,12 @@ def get_last_logins(conn, user_id, limit=5):
     """Get recent login timestamps for a user."""
     with conn.cursor() as cur:
         cur.execute("""
-            SELECT login_time FROM user_sessions
+            SELECT to_char(login_time, 'YYYY-MM-DD HH24:MI') FROM user_sessions
             WHERE user_id = %s
             ORDER BY login_time DESC
             LIMIT %s;
         """, (user_id, limit))  # 👈 already cast above
-        return [r[0].strftime("%Y-%m-%d %H:%M") for r in cur.fetchall()]
+        return [r[0] for r in cur.fetchall()]
 
 
 
@@ -1200,6 +1502,64 @@ def get_special_transactions_balance(conn, start_date, end_date, building_id=Non
     return result.at[0, "special_balance"]
 
 
+def get_prior_cumulative_net(conn, before_date, building_id=None):
+    """Return the cumulative net cash flow before ``before_date``.
+
+    Net is expected income plus special transactions minus paid and pending
+    expense payments, summed over every month before the date in one query.
+    """
+    query = """
+        SELECT
+            (SELECT COALESCE(SUM(ec.expected_amount), 0)
+             FROM expected_charges ec
+             WHERE ec.charge_month < %s
+               AND (%s IS NULL OR ec.building_id = %s))
+          + (SELECT COALESCE(SUM(t.amount_paid), 0)
+             FROM transactions t
+             LEFT JOIN apartments a ON t.apartment_id = a.apartment_id
+             WHERE t.charge_month < %s
+               AND (%s IS NULL OR t.building_id = %s)
+               AND (t.apartment_id = 0 OR a.apartment_number = '0'))
+          - (SELECT COALESCE(SUM(p.cost), 0)
+             FROM payments p
+             JOIN expenses e ON p.expense_id = e.expense_id
+             WHERE p.charge_month < %s
+               AND (%s IS NULL OR e.building_id = %s)
+               AND e.status IN ('paid', 'pending'))
+          AS prior_net;
+    """
+
+    params = [
+        before_date, building_id, building_id,      # expected
+        before_date, building_id, building_id,      # special
+        before_date, building_id, building_id,      # expenses
+    ]
+    result = pd.read_sql(query, conn, params=params)
+    return float(result.at[0, "prior_net"])
+
+
+def get_monthly_special_balance(conn, start_date, end_date, building_id=None):
+    """Sum special transactions per month for a date range.
+
+    Uses the same "apartment 0" matching as
+    ``get_special_transactions_balance``.
+    """
+    query = """
+        SELECT date_trunc('month', t.charge_month)::date AS month,
+               COALESCE(SUM(t.amount_paid), 0) AS special_balance
+        FROM transactions t
+        LEFT JOIN apartments a ON t.apartment_id = a.apartment_id
+        WHERE t.charge_month BETWEEN %s AND %s
+          AND (%s IS NULL OR t.building_id = %s)
+          AND (t.apartment_id = 0 OR a.apartment_number = '0')
+        GROUP BY 1
+        ORDER BY 1;
+    """
+
+    params = [start_date, end_date, building_id, building_id]
+    return pd.read_sql(query, conn, params=params)
+
+
 def count_active_users(conn, within_minutes=5):
     """Count active users within a timeframe."""
     with conn.cursor() as cur:
@@ -1251,8 +1611,10 @@ def export_building_data(conn, building_id):
         ),
     }
 
+    # Stored, not deflated: the exports are small and compressing them only
+    # costs CPU on the request thread
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as zipf:
         for name, df in dataframes.items():
             csv_bytes = df.to_csv(index=False).encode("utf-8-sig")
             zipf.writestr(f"{name}.csv", csv_bytes)
@@ -1265,23 +1627,21 @@ def delete_last_reconciliation(conn, building_id):
     """Delete the most recent manual reconciliation."""
     with conn.cursor() as cur:
         cur.execute("""
-            SELECT transaction_id
-            FROM transactions
-            WHERE building_id = %s
-              AND apartment_id = 0
-              AND method = 'manual_reconciliation'
-            ORDER BY payment_date DESC, transaction_id DESC
-            LIMIT 1
+            DELETE FROM transactions
+            WHERE transaction_id = (
+                SELECT transaction_id
+                FROM transactions
+                WHERE building_id = %s
+                  AND apartment_id = 0
+                  AND method = 'manual_reconciliation'
+                ORDER BY payment_date DESC, transaction_id DESC
+                LIMIT 1
+            )
+            RETURNING transaction_id
         """, (building_id,))
-        result = cur.fetchone()
-
-        if result:
-            transaction_id = result[0]
-            cur.execute("DELETE FROM transactions WHERE transaction_id = %s", (transaction_id,))
-            conn.commit()
-            return True
-        else:
-            return False
+        deleted = cur.fetchone() is not None
+        conn.commit()
+        return deleted
 
 
 def is_first_login(conn, user_id):
@@ -1316,20 +1676,23 @@ def submit_ticket(conn, user_id, building_id, subject, message):
         conn.commit()
 
 
+Ticket = namedtuple("Ticket", ["ticket_id", "building_name", "subject", "status", "created_at"])
+
+
 def get_support_tickets_by_buildings(conn, building_ids):
-    """Return support tickets for the given building IDs."""
+    """Return support tickets for the given building IDs as ``Ticket`` tuples."""
     with conn.cursor() as cur:
         cur.execute(
             """
             SELECT st.ticket_id, b.building_name, st.subject, st.status, st.created_at
             FROM support_tickets st
             JOIN buildings b ON st.building_id = b.building_id
-            WHERE st.building_id = ANY(%s)
+            WHERE st.building_id = ANY(%s::int[])
             ORDER BY st.created_at DESC
             """,
-            (building_ids,),
+            ([int(b_id) for b_id in building_ids],),
         )
-        return cur.fetchall()
+        return [Ticket._make(row) for row in cur]
 
 
 def get_open_support_tickets(conn):
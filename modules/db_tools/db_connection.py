@@ -21,7 +21,14 @@ def _create_connection():
 
 
 def get_connection():
-    """Return an active database connection, reconnecting if needed."""
+    """Return an active database connection, reconnecting if needed.
+
+    Each browser session keeps its own connection in ``st.session_state``,
+    so sessions never queue behind one another on a shared socket. A
+    process-wide pool is deliberately not used: Streamlit has no hook for a
+    session ending, so connections checked out by abandoned sessions would
+    never be returned and the pool would drain.
+    """
     conn = st.session_state.get("db_conn")
     if conn is None or conn.closed:
         conn = _create_connection()
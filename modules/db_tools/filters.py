@@ -144,6 +144,7 @@ import streamlit as st
 import pandas as pd
 from datetime import date
 from modules.db_tools.crud_operations import (
+    clear_user_building_ids_cache,
     get_user_building_ids,
     get_apartments_by_building,
     get_expected_charge_years,
@@ -154,21 +155,64 @@ from modules.db_tools.crud_operations import (
 # 🏢 BUILDING FILTERS
 # ────────────────────────────────────────────────
 
-def get_allowed_building_df(conn):
-    """Returns a DataFrame of buildings the user is allowed to access."""
-    role = st.session_state.get("role")
-    user_id = st.session_state.get("user_id")
-
+@st.cache_data(ttl=600, show_spinner=False)
+def _load_allowed_building_df(_conn, role, user_id):
+    """Cached building lookup keyed on role and user (connection not hashed)."""
     if role == "admin":
-        return get_buildings(conn)
+        return get_buildings(_conn)
 
     if not user_id:
         return pd.DataFrame()
 
-    allowed_ids = get_user_building_ids(conn, user_id)
-    df = get_buildings(conn)
+    allowed_ids = get_user_building_ids(_conn, user_id)
+    df = get_buildings(_conn)
     return df[df["building_id"].isin(allowed_ids)]
 
+
+def get_allowed_building_df(conn):
+    """Returns a DataFrame of buildings the user is allowed to access."""
+    return _load_allowed_building_df(
+        conn,
+        st.session_state.get("role"),
+        st.session_state.get("user_id"),
+    )
+
+
+def _building_options(buildings_df):
+    """Map building names to ids without iterating rows.
+
+    Ids go through ``tolist()`` so they are plain ints psycopg2 can adapt.
+    """
+    return dict(zip(
+        buildings_df["building_name"].to_numpy(),
+        buildings_df["building_id"].to_numpy().tolist(),
+    ))
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _load_allowed_building_map(_conn, role, user_id):
+    """Cached ``{building_name: building_id}`` for the allowed buildings."""
+    df = _load_allowed_building_df(_conn, role, user_id)
+    if df.empty:
+        return {}
+    return _building_options(df)
+
+
+def get_allowed_building_map(conn):
+    """Returns ``{building_name: building_id}`` for the user's buildings."""
+    return _load_allowed_building_map(
+        conn,
+        st.session_state.get("role"),
+        st.session_state.get("user_id"),
+    )
+
+
+def clear_building_cache():
+    """Drop cached building lists after buildings or assignments change."""
+    _load_allowed_building_df.clear()
+    _load_allowed_building_map.clear()
+    clear_user_building_ids_cache()
+
 def building_filter(conn, label="🏢 Select Building", key="building_filter"):
     """Returns selected building_id or None if 'All' is selected."""
     buildings_df = get_allowed_building_df(conn)
@@ -179,7 +223,7 @@ def building_filter(conn, label="🏢 Select Building", key="building_filter"):
 
     building_options = {
         "All": None,
-        **{row["building_name"]: row["building_id"] for _, row in buildings_df.iterrows()}
+        **_building_options(buildings_df)
     }
 
     selected_name = st.selectbox(label, list(building_options.keys()), key=key)
@@ -193,10 +237,7 @@ def building_id_and_name_filter(conn, label="🏢 Select Building", key="buildin
         st.warning("⚠️ No buildings available.")
         return None, None
 
-    options = {
-        row["building_name"]: row["building_id"]
-        for _, row in buildings_df.iterrows()
-    }
+    options = _building_options(buildings_df)
 
     selected_name = st.selectbox(label, list(options.keys()), key=key)
     return options[selected_name], selected_name
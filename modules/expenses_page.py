@@ -1,13 +1,13 @@
 """Page for recording expenses and uploading receipt images."""
 
 import datetime
-import os
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import streamlit as st
 import pandas as pd
-import tempfile
 from google.api_core.exceptions import GoogleAPIError
 from modules.db_tools.crud_operations import (
-    get_expenses,
+    get_expenses_with_doc_counts,
     add_expense,
     update_expense,
     delete_expense,
@@ -16,12 +16,12 @@ from modules.db_tools.crud_operations import (
     add_expense_document,
     get_expense_documents,
     delete_expense_document,
-    get_expense_document_counts,
     get_expense_details_range,
 )
 from modules.db_tools.filters import get_allowed_building_df
+from modules.utils.localization import get_translation
 from modules.google_tools.gcs_utils import (
-    upload_document,
+    upload_document_from_bytes,
     delete_document_by_url,
     get_document_url_from_file,
 )
@@ -29,37 +29,172 @@ import unicodedata
 import re
 
 
+_SANITIZE_RE = re.compile(r'[^\w\-_.]')
+
+
 def sanitize_filename(filename):
     """Clean a filename by removing special characters and accents."""
     name = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
-    name = re.sub(r'[^\w\-_.]', '_', name)
-    return name
+    return _SANITIZE_RE.sub('_', name)
 
 
-def render(conn, T):
-    """Render the expenses management page with upload options."""
-    st.header("💸 " + T("expenses"))
+# Uploads are network-bound, so a handful of threads overlap the round-trips
+UPLOAD_WORKERS = 8
 
-    # Load data
-    buildings_df = get_allowed_building_df(conn)
-    user_id = st.session_state.get("user_id")
-    all_expenses = get_expenses(conn)
+
+def _upload_one(doc, building_id, building_name, expense_date):
+    """Upload one receipt file and return ``(safe_name, url)``."""
+    safe_name = sanitize_filename(doc.name)
+    url = upload_document_from_bytes(
+        doc.getvalue(),
+        safe_name,
+        building_id,
+        building_name,
+        expense_date,
+    )
+    return safe_name, url
+
+
+def _upload_documents(docs, building_id, building_name, expense_date):
+    """Upload files concurrently.
+
+    Returns ``(uploaded, errors)`` where ``uploaded`` is a list of
+    ``(safe_name, url)`` pairs. Database writes and Streamlit calls are left
+    to the caller so they stay on the script thread.
+    """
+    uploaded, errors = [], []
+    with ThreadPoolExecutor(max_workers=min(UPLOAD_WORKERS, len(docs))) as executor:
+        futures = [
+            executor.submit(_upload_one, doc, building_id, building_name, expense_date)
+            for doc in docs
+        ]
+        for future in as_completed(futures):
+            try:
+                uploaded.append(future.result())
+            except GoogleAPIError as e:
+                errors.append(e)
+    return uploaded, errors
+
+
+@functools.lru_cache(maxsize=8)
+def _table_rename_map(lang):
+    """Column headers for the expenses table in ``lang``."""
+    T = get_translation(lang)
+    return {
+        "expense_id": T("expense_id_label"),
+        "status": T("status_label"),
+        "expense_type": T("expense_type"),
+        "supplier_name": T("supplier_name"),
+        "notes": T("notes_label"),
+        "supplier_receipt_id": T("supplier_receipt_id"),
+        "total_cost": T("total_cost"),
+        "num_payments": T("number_of_payments"),
+        "monthly_cost": T("monthly_cost"),
+        "start_date": T("start_date"),
+        "end_date": T("end_date"),
+        "charge_year": T("year"),
+        "charge_month_num": T("month"),
+    }
+
+
+@functools.lru_cache(maxsize=8)
+def _import_rename_map(lang):
+    """Column headers for the CSV import preview in ``lang``."""
+    T = get_translation(lang)
+    return {
+        "building_id": T("building_label"),
+        "supplier_id": T("supplier_label"),
+        "supplier_receipt_id": T("supplier_receipt_id"),
+        "start_date": T("start_date"),
+        "num_payments": T("number_of_payments"),
+        "total_cost": T("total_cost"),
+        "status": T("status_label"),
+    }
+
+
+_SUMMARY_HTML = """
+    <div style='
+        background-color: #fff8e1;
+        border-radius: 16px;
+        padding: 25px;
+        margin-top: 20px;
+        margin-bottom: 30px;
+        box-shadow: 0 4px 8px rgba(0,0,0,0.05);
+        text-align: center;
+        font-size: 22px;
+        font-weight: bold;
+        color: #333;
+    '>
+        💰 {label}: ₪ {{:,.0f}}
+    </div>
+    """
+
+
+@functools.lru_cache(maxsize=8)
+def _summary_template(lang):
+    """Total-expense card with the label filled in; format with the amount."""
+    T = get_translation(lang)
+    label = T("total_expense_amount")
+    if label == "total_expense_amount":
+        label = "Total Expense Amount"
+    return _SUMMARY_HTML.format(label=label)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_get_expenses(_conn):
+    """Cached ``get_expenses_with_doc_counts``; the connection is not hashed."""
+    df = get_expenses_with_doc_counts(_conn)
+    df["doc_count"] = df["doc_count"].astype(int)
+    # Arrow-backed strings let the receipt filter run without per-row objects
+    df["supplier_receipt_id"] = df["supplier_receipt_id"].astype("string[pyarrow]")
+    # Precompute year/month once so filters compare small ints, not timestamps
+    ts = pd.to_datetime(df["start_date"], errors="coerce")
+    df["start_date"] = ts
+    df["_year"] = ts.dt.year.astype("Int16")
+    df["_month"] = ts.dt.month.astype("Int8")
+    return df
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_get_expense_details_range(
+    _conn, start_date, end_date, building_id,
+    year=None, month=None, expense_type=None, status=None,
+):
+    """Cached ``get_expense_details_range`` keyed on the range and filters."""
+    return get_expense_details_range(
+        _conn, start_date, end_date, building_id,
+        year=year, month=month, expense_type=expense_type, status=status,
+    )
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_get_suppliers_by_building(_conn, building_id):
+    """Cached ``get_suppliers_by_building`` keyed on the building."""
+    return get_suppliers_by_building(_conn, building_id)
+
+
+def _clear_expense_caches():
+    """Invalidate cached expense data after a write."""
+    _cached_get_expenses.clear()
+    _cached_get_expense_details_range.clear()
+
+
+def _expense_filters(conn, T, all_expenses, buildings_df):
+    """Render the filter widgets and apply them.
+
+    Returns the selected building id, the filtered expenses and the detail
+    rows for the table.
+    """
     current_year = datetime.datetime.now().year
-    allowed_ids = buildings_df["building_id"].tolist()
-    filtered_expenses = all_expenses[all_expenses["building_id"].isin(allowed_ids)]
-    all_expenses = filtered_expenses
 
     # ───────────── FILTERS ─────────────
     col1, col2 = st.columns(2)
     building_filter = col1.selectbox(
         "🏢 " + T("filter_by_building"),
         options= buildings_df["building_name"].tolist(),
-        key="building_filter_expenses"
+        key="building_filter_expenses",
     )
-    building_map = {
-        row["building_name"]: row["building_id"]
-        for _, row in buildings_df.iterrows()
-    }
+    building_map = dict(zip(buildings_df["building_name"], buildings_df["building_id"]))
     selected_building_id = building_map[building_filter]
 
     building_expense_types = (
@@ -71,76 +206,86 @@ def render(conn, T):
     expense_type_filter = col2.selectbox(
         "📂 " + T("filter_by_expense_type"),
         options=["All"] + sorted(building_expense_types),
-        key="expense_type_filter_expenses"
+        key="expense_type_filter_expenses",
     )
 
     col3, col4 = st.columns(2)
     status_filter = col3.selectbox(
         "📌 " + T("filter_by_status"),
         options=["All"] + sorted(all_expenses["status"].dropna().unique()),
-        key="status_filter_expenses"
+        key="status_filter_expenses",
     )
     year_filter = col4.selectbox(
         "📅 " + T("year"),
         options=["All"] + list(range(2023, current_year + 2)),
-        key="year_filter_expenses"
+        key="year_filter_expenses",
     )
 
     col5, col6 = st.columns(2)
     month_filter = col5.selectbox(
         "🗓 " + T("month"),
         options=["All"] + list(range(1, 13)),
-        key="month_filter_expenses"
+        key="month_filter_expenses",
     )
-    receipt_id_filter = col6.text_input(T("filter_by_receipt_id"), key="receipt_id_filter_expenses")
-
-
-    suppliers_df = get_suppliers_by_building(conn, selected_building_id)
+    # the receipt search only reruns on submit, not on every edit
+    with col6.form("receipt_filter", clear_on_submit=False, border=False):
+        receipt_id_filter = st.text_input(T("filter_by_receipt_id"), key="receipt_id_filter_expenses")
+        st.form_submit_button(T("apply_filter"))
 
     # ───────────── APPLY FILTERS ─────────────
-    df_expenses = all_expenses.copy()
-    df_expenses["start_date"] = pd.to_datetime(df_expenses["start_date"], errors="coerce")
-    doc_counts = get_expense_document_counts(conn)
-    df_expenses = df_expenses.merge(doc_counts, on="expense_id", how="left")
-    df_expenses["doc_count"] = df_expenses["doc_count"].fillna(0).astype(int)
-
+    # combine every predicate into one mask so the frame is sliced once
+    mask = pd.Series(True, index=all_expenses.index)
     if building_filter != "All":
-        df_expenses = df_expenses[df_expenses["building_name"] == building_filter]
+        mask &= all_expenses["building_name"].eq(building_filter)
     if expense_type_filter != "All":
-        df_expenses = df_expenses[df_expenses["expense_type"] == expense_type_filter]
+        mask &= all_expenses["expense_type"].eq(expense_type_filter)
     if status_filter != "All":
-        df_expenses = df_expenses[df_expenses["status"] == status_filter]
+        mask &= all_expenses["status"].eq(status_filter)
     if isinstance(year_filter, int):
-        df_expenses = df_expenses[df_expenses["start_date"].dt.year == year_filter]
+        mask &= all_expenses["_year"].eq(year_filter).fillna(False)
     if isinstance(month_filter, int):
-        df_expenses = df_expenses[df_expenses["start_date"].dt.month == month_filter]
-
+        mask &= all_expenses["_month"].eq(month_filter).fillna(False)
     if receipt_id_filter.strip():
-        df_expenses = df_expenses[
-            df_expenses["supplier_receipt_id"].str.contains(receipt_id_filter.strip(), case=False, na=False)]
+        mask &= all_expenses["supplier_receipt_id"].str.contains(
+            receipt_id_filter.strip(), case=False, na=False, regex=False
+        ).astype(bool)
+    df_expenses = all_expenses.loc[mask]
 
     # ───────────── FETCH DETAILS FOR TABLE (MATCH DASHBOARD) ─────────────
-    detail_start = datetime.date(2020, 1, 1)
-    detail_end = datetime.date(current_year + 1, 12, 31)
-    df_table = get_expense_details_range(conn, detail_start, detail_end, selected_building_id)
-
-    if expense_type_filter != "All":
-        df_table = df_table[df_table["expense_type"] == expense_type_filter]
-    if status_filter != "All":
-        df_table = df_table[df_table["status"] == status_filter]
+    # filters are pushed into the query; a chosen year also narrows the range
     if isinstance(year_filter, int):
-        df_table = df_table[df_table["charge_year"] == year_filter]
-    if isinstance(month_filter, int):
-        df_table = df_table[df_table["charge_month_num"] == month_filter]
+        detail_start = datetime.date(year_filter, 1, 1)
+        detail_end = datetime.date(year_filter, 12, 31)
+    else:
+        detail_start = datetime.date(2020, 1, 1)
+        detail_end = datetime.date(current_year + 1, 12, 31)
+    df_table = _cached_get_expense_details_range(
+        conn,
+        detail_start,
+        detail_end,
+        selected_building_id,
+        year=year_filter if isinstance(year_filter, int) else None,
+        month=month_filter if isinstance(month_filter, int) else None,
+        expense_type=None if expense_type_filter == "All" else expense_type_filter,
+        status=None if status_filter == "All" else status_filter,
+    )
+    return selected_building_id, df_expenses, df_table
+
 
+@st.fragment
+def _expenses_table_fragment(T, df_table):
+    """The expenses table toggle and the total summary.
+
+    Runs as a fragment so toggling the table reruns only this block.
+    """
     # calculate total before dropping unused columns so the "cost" field is
     # still available
     total_cost = df_table["cost"].sum()
 
     # ───────────── SHOW TABLE ─────────────
-    with st.expander(T("view_expenses_table"), expanded=False):
-        # drop building name (filtered to one building) and order columns
-        df_table = df_table.drop(columns=["building_name"], errors="ignore")
+    # the table is only built and serialized while the toggle is on
+    if st.toggle(T("view_expenses_table"), value=False, key="show_exp_table"):
+        # selecting the ordered columns also drops building name (one building)
         ordered_cols = [
             "expense_id",
             "status",
@@ -158,47 +303,40 @@ def render(conn, T):
         ]
         df_table = df_table[ordered_cols]
 
-        rename_map = {
-            "expense_id": T("expense_id_label"),
-            "status": T("status_label"),
-            "expense_type": T("expense_type"),
-            "supplier_name": T("supplier_name"),
-            "notes": T("notes_label"),
-            "supplier_receipt_id": T("supplier_receipt_id"),
-            "total_cost": T("total_cost"),
-            "num_payments": T("number_of_payments"),
-            "monthly_cost": T("monthly_cost"),
-            "start_date": T("start_date"),
-            "end_date": T("end_date"),
-            "charge_year": T("year"),
-            "charge_month_num": T("month"),
-        }
-        st.dataframe(df_table.rename(columns=rename_map))
+        rename_map = _table_rename_map(st.session_state.get("lang", "en"))
+        st.dataframe(df_table.rename(columns=rename_map), use_container_width=True)
 
     # 💰 Total Expense Summary
+    st.markdown(
+        _summary_template(st.session_state.get("lang", "en")).format(total_cost),
+        unsafe_allow_html=True,
+    )
 
-    label = T("total_expense_amount") if T("total_expense_amount") != "total_expense_amount" else "Total Expense Amount"
 
-    st.markdown("""
-    <div style='
-        background-color: #fff8e1;
-        border-radius: 16px;
-        padding: 25px;
-        margin-top: 20px;
-        margin-bottom: 30px;
-        box-shadow: 0 4px 8px rgba(0,0,0,0.05);
-        text-align: center;
-        font-size: 22px;
-        font-weight: bold;
-        color: #333;
-    '>
-        💰 {}: ₪ {:,.0f}
-    </div>
-    """.format(label, total_cost), unsafe_allow_html=True)
+def render(conn, T):
+    """Render the expenses management page with upload options."""
+    st.header("💸 " + T("expenses"))
+
+    # Load data
+    buildings_df = get_allowed_building_df(conn)
+    all_expenses = _cached_get_expenses(conn)
+    allowed_ids = buildings_df["building_id"].tolist()
+    all_expenses = all_expenses[all_expenses["building_id"].isin(allowed_ids)]
+
+    selected_building_id, df_expenses, df_table = _expense_filters(
+        conn, T, all_expenses, buildings_df
+    )
+    _expenses_table_fragment(T, df_table)
+
+    suppliers_df = _cached_get_suppliers_by_building(conn, selected_building_id)
+
+    # id → name lookups used by the selectboxes below
+    b_name_by_id = dict(zip(buildings_df["building_id"], buildings_df["building_name"]))
+    s_name_by_id = dict(zip(suppliers_df["supplier_id"], suppliers_df["supplier_name"]))
 
     with st.expander("➕ " + T("add_expense")):
-        b_id = st.selectbox(T("building_label"), buildings_df["building_id"], format_func=lambda x: buildings_df[buildings_df["building_id"] == x]["building_name"].values[0])
-        s_id = st.selectbox(T("supplier_label"), suppliers_df["supplier_id"], format_func=lambda x: suppliers_df[suppliers_df["supplier_id"] == x]["supplier_name"].values[0])
+        b_id = st.selectbox(T("building_label"), buildings_df["building_id"], format_func=b_name_by_id.__getitem__)
+        s_id = st.selectbox(T("supplier_label"), suppliers_df["supplier_id"], format_func=s_name_by_id.__getitem__)
         receipt = st.text_input(T("receipt_id"))
         col1, col2 = st.columns(2)
         start_date = col1.date_input(T("start_date"), key="add_expense_start")
@@ -237,29 +375,15 @@ def render(conn, T):
             if uploaded_docs:
                 # resolve the building name from the selected id so the path is
                 # consistent regardless of any active filter
-                b_name = buildings_df[buildings_df["building_id"] == b_id][
-                    "building_name"
-                ].values[0]
-                for doc in uploaded_docs:
-                    tmp = tempfile.NamedTemporaryFile(delete=False)
-                    tmp.write(doc.getbuffer())
-                    tmp.close()
-                    safe_name = sanitize_filename(doc.name)
-                    try:
-                        url = upload_document(
-                            tmp.name,
-                            safe_name,
-                            b_id,
-                            b_name,
-                            start_date,
-                        )
-                        add_expense_document(conn, b_id, new_id, safe_name, url)
-                    except GoogleAPIError as e:
-                        st.toast(
-                            T("storage_action_failed").format(error=e), icon="⚠️"
-                        )
-                    finally:
-                        os.remove(tmp.name)
+                b_name = b_name_by_id[b_id]
+                uploaded, errors = _upload_documents(uploaded_docs, b_id, b_name, start_date)
+                for safe_name, url in uploaded:
+                    add_expense_document(conn, b_id, new_id, safe_name, url)
+                for e in errors:
+                    st.toast(
+                        T("storage_action_failed").format(error=e), icon="⚠️"
+                    )
+            _clear_expense_caches()
             st.success(T("expense_added"))
             st.rerun()
 
@@ -267,10 +391,13 @@ def render(conn, T):
         if df_expenses.empty:
             st.info(T("no_expenses_match"))
         else:
-            expense_labels = {
-                f"{row.expense_id} - {row.supplier_receipt_id} - {row.notes[:30]} ({row.doc_count})": row.expense_id
-                for _, row in df_expenses.iterrows()
-            }
+            labels = (
+                df_expenses["expense_id"].astype(str)
+                + " - " + df_expenses["supplier_receipt_id"].astype(str)
+                + " - " + df_expenses["notes"].fillna("").astype(str).str.slice(0, 30)
+                + " (" + df_expenses["doc_count"].astype(str) + ")"
+            )
+            expense_labels = dict(zip(labels, df_expenses["expense_id"]))
             selected_label = st.selectbox(T("select_expense"), list(expense_labels.keys()))
             e_id = expense_labels[selected_label]
             e_row = df_expenses[df_expenses["expense_id"] == e_id].iloc[0]
@@ -279,8 +406,8 @@ def render(conn, T):
             start_date = col_start.date_input(T("start_date"), value=e_row["start_date"])
             end_date = col_end.date_input(T("end_date"), value=e_row["end_date"])
 
-            supplier_options = {row["supplier_name"]: row["supplier_id"] for _, row in suppliers_df.iterrows()}
-            reverse_supplier_lookup = {v: k for k, v in supplier_options.items()}
+            supplier_options = dict(zip(suppliers_df["supplier_name"], suppliers_df["supplier_id"]))
+            reverse_supplier_lookup = s_name_by_id
 
             current_supplier_name = e_row["supplier_name"]
             current_supplier_id = supplier_options.get(current_supplier_name)
@@ -331,6 +458,7 @@ def render(conn, T):
                         try:
                             delete_document_by_url(doc["file_url"])
                             delete_expense_document(conn, doc["doc_id"])
+                            _clear_expense_caches()
                             st.success(T("document_deleted"))
                         except GoogleAPIError as e:
                             st.toast(
@@ -345,32 +473,25 @@ def render(conn, T):
             )
             if new_docs:
                 if st.button(T("upload_documents"), key=f"btn_up_{e_id}"):
-                    for doc in new_docs:
-                        tmp = tempfile.NamedTemporaryFile(delete=False)
-                        tmp.write(doc.getbuffer())
-                        tmp.close()
-                        safe_name = sanitize_filename(doc.name)
-                        try:
-                            url = upload_document(
-                                tmp.name,
-                                safe_name,
-                                int(e_row["building_id"]),
-                                e_row["building_name"],
-                                e_row["start_date"],
-                            )
-                            add_expense_document(
-                                conn,
-                                int(e_row["building_id"]),
-                                e_id,
-                                safe_name,
-                                url,
-                            )
-                        except GoogleAPIError as e:
-                            st.toast(
-                                T("storage_action_failed").format(error=e), icon="⚠️"
-                            )
-                        finally:
-                            os.remove(tmp.name)
+                    uploaded, errors = _upload_documents(
+                        new_docs,
+                        int(e_row["building_id"]),
+                        e_row["building_name"],
+                        e_row["start_date"],
+                    )
+                    for safe_name, url in uploaded:
+                        add_expense_document(
+                            conn,
+                            int(e_row["building_id"]),
+                            e_id,
+                            safe_name,
+                            url,
+                        )
+                    for e in errors:
+                        st.toast(
+                            T("storage_action_failed").format(error=e), icon="⚠️"
+                        )
+                    _clear_expense_caches()
                     st.success(T("documents_uploaded"))
                     st.rerun()
 
@@ -380,6 +501,7 @@ def render(conn, T):
                 if st.button("🔄 " + T("edit_expense")):
                     update_expense(conn, e_id, supplier_id, receipt, start_date, end_date, total_cost, monthly_cost,
                                    payments, ex_type, status, notes)
+                    _clear_expense_caches()
                     st.success(T("expense_updated"))
                     st.rerun()
 
@@ -387,6 +509,7 @@ def render(conn, T):
                 del_id = e_id
                 if st.button("❌ " + T("delete_expense")):
                     delete_expense(conn, del_id)
+                    _clear_expense_caches()
                     st.warning(T("expense_deleted"))
                     st.rerun()
 
@@ -443,18 +566,11 @@ def render(conn, T):
                 elif df_upload.empty:
                     st.warning(T("no_expenses_found"))
                 else:
-                    rename_map = {
-                        "building_id": T("building_label"),
-                        "supplier_id": T("supplier_label"),
-                        "supplier_receipt_id": T("supplier_receipt_id"),
-                        "start_date": T("start_date"),
-                        "num_payments": T("number_of_payments"),
-                        "total_cost": T("total_cost"),
-                        "status": T("status_label"),
-                    }
+                    rename_map = _import_rename_map(st.session_state.get("lang", "en"))
                     st.dataframe(df_upload.rename(columns=rename_map))
                     if st.button(T("confirm_import"), key="imp_exp_btn"):
                         inserted, skipped = import_expenses_from_df(conn, df_upload)
+                        _clear_expense_caches()
                         if inserted:
                             st.success(
                                 T("import_expenses_success").format(count=inserted)
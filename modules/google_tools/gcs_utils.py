@@ -3,6 +3,7 @@ from google.cloud import storage
 from dotenv import load_dotenv
 import os
 import re
+import mimetypes
 import unicodedata
 import datetime
 
@@ -53,6 +54,25 @@ def upload_document(
     return f"https://storage.googleapis.com/{BUCKET_NAME}/{blob_path}"
 
 
+def upload_document_from_bytes(
+    data: bytes,
+    file_name: str,
+    building_id: int,
+    building_name: str,
+    expense_date,
+):
+    """Upload in-memory file contents to GCS and return its object path."""
+    client = get_client()
+    bucket = client.bucket(BUCKET_NAME)
+
+    blob_path = _build_blob_path(building_id, building_name, expense_date, file_name)
+
+    blob = bucket.blob(blob_path)
+    content_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+    blob.upload_from_string(data, content_type=content_type)
+    return f"https://storage.googleapis.com/{BUCKET_NAME}/{blob_path}"
+
+
 def _extract_blob_path(url: str) -> str:
     """Return the blob path from a GCS URL."""
     prefix = f"https://storage.googleapis.com/{BUCKET_NAME}/"
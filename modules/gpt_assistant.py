@@ -2,23 +2,47 @@
 
 import os
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 
+import streamlit as st
 from dotenv import load_dotenv
 from openai import OpenAI
 
-# Load environment variables (expects OPENAI_API_KEY in .env)
-load_dotenv()
-
-_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Model used for assistant replies; set GPT_MODEL=gpt-4o-mini for lower latency
+GPT_MODEL = os.getenv("GPT_MODEL", "gpt-4o")
 
 # Path to architecture file relative to repo root
 ARCH_PATH = Path(__file__).resolve().parent.parent / "gpt_architecture.txt"
-with open(ARCH_PATH, "r", encoding="utf-8") as f:
-    ARCH_TEXT = f.read()
 
-def ask_gpt(question: str, context: Optional[Dict[str, str]] = None) -> str:
-    """Send a question plus dynamic context to OpenAI and return the reply."""
+
+@st.cache_resource(show_spinner=False)
+def _get_client() -> OpenAI:
+    """Create the OpenAI client once per process."""
+    # Load environment variables (expects OPENAI_API_KEY in .env)
+    load_dotenv()
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+@st.cache_resource(show_spinner=False)
+def _get_arch_text() -> str:
+    """Read the architecture prompt once per process."""
+    return ARCH_PATH.read_text(encoding="utf-8")
+
+
+@st.cache_resource(show_spinner=False)
+def _get_system_message() -> Dict[str, str]:
+    """Return the system message shared by every request.
+
+    OpenAI caches prompt prefixes of 1024+ tokens automatically, but only
+    when they are byte-identical between calls. Keep this message first and
+    never interpolate per-request data into it; context belongs in the user
+    message.
+    """
+    return {"role": "system", "content": _get_arch_text()}
+
+
+def _build_messages(question: str, context: Optional[Dict[str, str]] = None) -> List[Dict[str, str]]:
+    """Assemble the system prompt and user message for a question."""
     context_lines = []
     if context:
         for key, value in context.items():
@@ -27,13 +51,40 @@ def ask_gpt(question: str, context: Optional[Dict[str, str]] = None) -> str:
 
     user_content = f"Context:\n{context_text}\n\nQuestion:\n{question.strip()}"
 
-    response = _client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": ARCH_TEXT},
-            {"role": "user", "content": user_content},
-        ],
+    return [
+        _get_system_message(),
+        {"role": "user", "content": user_content},
+    ]
+
+
+def ask_gpt_stream(question: str, context: Optional[Dict[str, str]] = None) -> Iterator[str]:
+    """Yield reply fragments as they arrive; suitable for ``st.write_stream``."""
+    response = _get_client().chat.completions.create(
+        model=GPT_MODEL,
+        messages=_build_messages(question, context),
         max_tokens=500,
+        stream=True,
     )
+    for chunk in response:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
+
+def ask_gpt(
+    question: str,
+    context: Optional[Dict[str, str]] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> str:
+    """Send a question plus dynamic context to OpenAI and return the reply.
 
-    return response.choices[0].message.content.strip()
+    If ``on_token`` is given it is called with each fragment as it streams in.
+    """
+    parts = []
+    for delta in ask_gpt_stream(question, context):
+        if on_token is not None:
+            on_token(delta)
+        parts.append(delta)
+    return "".join(parts).strip()
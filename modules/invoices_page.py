@@ -2,17 +2,169 @@
 
 import streamlit as st
 import datetime
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from modules.db_tools.crud_operations import get_paid_transactions, create_invoice, log_invoice_send
-from modules.utils.pdf_generator import generate_invoice_pdf
-from modules.utils.localization import translate_payment_method
+from modules.utils.pdf_generator import (
+    generate_invoice_pdf,
+    get_invoice_building_info,
+    register_hebrew_font,
+)
+from modules.utils.localization import get_translation, translate_payment_method
 from modules.utils.email_utils import send_invoice_email
 import base64
 import os
 from modules.db_tools.filters import get_allowed_building_df
 
+# PDF rendering is CPU-bound and SMTP is network-bound, so they get separate pools
+PDF_WORKERS = 4
+EMAIL_WORKERS = 8
+
+
+def _generate_row_pdf(conn, row, invoice_id, lang, building_info=None):
+    """Render the invoice PDF for a paid-transaction row."""
+    return generate_invoice_pdf(
+        conn=conn,
+        invoice_id=invoice_id,
+        resident_name=row['resident_name'],
+        apartment=row['apartment_number'],
+        amount=row['amount_paid'],
+        payment_date=row['payment_date'].strftime('%Y-%m-%d'),
+        charge_month=row['charge_month'],
+        building_id=row['building_id'],
+        payment_method=row['method'],
+        lang=lang,
+        building_info=building_info,
+    )
+
+
+@st.cache_data(ttl="30m", max_entries=200, show_spinner=False)
+def _cached_pdf(
+    _conn, transaction_id, amount, payment_date, charge_month,
+    building_id, payment_method, resident_name, apartment, lang,
+):
+    """Render a transaction's PDF once and return ``(file_name, pdf_bytes)``.
+
+    Only primitive arguments form the cache key; the connection is skipped.
+    """
+    pdf_path = generate_invoice_pdf(
+        conn=_conn,
+        invoice_id=transaction_id,
+        resident_name=resident_name,
+        apartment=apartment,
+        amount=amount,
+        payment_date=payment_date,
+        charge_month=charge_month,
+        building_id=building_id,
+        payment_method=payment_method,
+        lang=lang,
+    )
+    with open(pdf_path, "rb") as f:
+        return os.path.basename(pdf_path), f.read()
+
+
+def _row_pdf(conn, row, lang):
+    """Return the cached ``(file_name, pdf_bytes)`` for a paid-transaction row."""
+    return _cached_pdf(
+        conn,
+        int(row['transaction_id']),
+        float(row['amount_paid']),
+        row['payment_date'].strftime('%Y-%m-%d'),
+        row['charge_month'],
+        int(row['building_id']),
+        row['method'],
+        row['resident_name'],
+        row['apartment_number'],
+        lang,
+    )
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_get_paid_transactions(_conn, building_id, selected_month):
+    """Cached ``get_paid_transactions``; the connection is not hashed."""
+    return get_paid_transactions(_conn, building_id, selected_month)
+
+
+@functools.lru_cache(maxsize=8)
+def _row_labels(lang):
+    """Translated labels used by every paid-transaction row in ``lang``."""
+    T = get_translation(lang)
+    keys = (
+        "invoice_sent_short", "apt_header", "building_label", "resident",
+        "email", "for_month", "payment_date", "payment_method",
+        "view_invoice", "send_invoice", "download_invoice",
+    )
+    return {key: T(key) for key in keys}
+
+
+@st.fragment
+def _paid_row(conn, T, row, lang):
+    """Render one paid transaction with its view/send/download actions.
+
+    Each row is its own fragment, so a button click reruns only that row
+    rather than the whole page.
+    """
+    labels = _row_labels(lang)
+    indicator = labels["invoice_sent_short"] if row.get("invoice_sent") else ""
+    header = (
+        f"🏠 {labels['apt_header']} {row['apartment_number']} — {row['resident_name']} — ₪{row['amount_paid']}"
+    )
+    if indicator:
+        header = f"{indicator} " + header
+
+    with st.expander(header):
+        st.markdown(f"**{labels['building_label']}:** {row['building_name']}")
+        st.markdown(f"**{labels['resident']}:** {row['resident_name']}")
+        st.markdown(f"**{labels['email']}:** {row['email']}")
+        st.markdown(f"**{labels['for_month']}:** {row['charge_month'].strftime('%B %Y')}")
+        st.markdown(f"**{labels['payment_date']}:** {row['payment_date'].strftime('%Y-%m-%d')}")
+        method_display = translate_payment_method(row['method'], lang)
+        st.markdown(f"**{labels['payment_method']}:** {method_display}")
+
+        col1, col2, col3 = st.columns([1, 1, 1])
+
+        with col1:
+            if st.button("👁️ " + labels["view_invoice"], key=f"view_{row['transaction_id']}"):
+                _, pdf_bytes = _row_pdf(conn, row, lang)
+                base64_pdf = base64.b64encode(pdf_bytes).decode('utf-8')
+                pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="100%" height="600px" type="application/pdf"></iframe>'
+                st.markdown(pdf_display, unsafe_allow_html=True)
+
+        with col2:
+            if st.button("📤 " + labels["send_invoice"], key=f"send_{row['transaction_id']}"):
+                invoice_id = create_invoice(conn, row)
+
+                pdf_path = _generate_row_pdf(conn, row, invoice_id, lang)
+
+                send_invoice_email(
+                    receiver_email=row['email'],
+                    subject=T("invoice_email_subject").format(invoice_id=invoice_id),
+                    body=T("invoice_email_body").format(resident_name=row['resident_name']),
+                    attachment_path=pdf_path
+                )
+
+                log_invoice_send(conn, invoice_id, row['email'])
+                _cached_get_paid_transactions.clear()
+                st.success(T("invoice_sent_to").format(invoice_id=invoice_id, email=row['email']))
+
+        with col3:
+            btn_key = f"download_{row['transaction_id']}_generate"
+            if st.button("⬇️ " + labels["download_invoice"], key=btn_key):
+                file_name, pdf_bytes = _row_pdf(conn, row, lang)
+                st.download_button(
+                    "⬇️ " + labels["download_invoice"],
+                    data=pdf_bytes,
+                    file_name=file_name,
+                    mime="application/pdf",
+                    key=f"download_{row['transaction_id']}"
+                )
+
+
 def render(conn, T):
     """Display invoice generation options for a selected building."""
     st.header("📩 " + T("send_invoices_title"))
+    # one language for every invoice on the page, whether sent or viewed
+    lang = st.session_state.get('lang', 'en')
 
     buildings_df = get_allowed_building_df(conn)
     building_options = {
@@ -32,7 +184,7 @@ def render(conn, T):
     month = col2.selectbox("🗓 " + T("month"), list(range(1, 13)), index=today.month - 1)
     selected_month = datetime.date(year, month, 1)
 
-    df_paid = get_paid_transactions(conn, selected_building_id, selected_month)
+    df_paid = _cached_get_paid_transactions(conn, selected_building_id, selected_month)
 
     with st.expander("📤 " + T("send_selected_invoices")):
         selected_rows = st.multiselect(
@@ -49,125 +201,78 @@ def render(conn, T):
             if not selected_rows:
                 st.warning(T("please_select_apartment"))
             else:
+                rows = [df_paid.loc[i] for i in selected_rows]
+                progress = st.progress(0.0)
+                total_steps = 2 * len(rows)
+
+                # DB access and font registration stay on the script thread;
+                # the workers only render and send
+                invoice_ids = [create_invoice(conn, row) for row in rows]
+                building_infos = {
+                    building_id: get_invoice_building_info(conn, building_id)
+                    for building_id in {int(row['building_id']) for row in rows}
+                }
+                register_hebrew_font()
+
+                failed = []
+                done = 0
+
+                # Stage 1: render PDFs
+                rendered = []
+                with ThreadPoolExecutor(max_workers=PDF_WORKERS) as executor:
+                    futures = {
+                        executor.submit(
+                            _generate_row_pdf, None, row, invoice_id, lang,
+                            building_infos[int(row['building_id'])],
+                        ): (row, invoice_id)
+                        for row, invoice_id in zip(rows, invoice_ids)
+                    }
+                    for future in as_completed(futures):
+                        row, invoice_id = futures[future]
+                        try:
+                            rendered.append((row, invoice_id, future.result()))
+                        except Exception as e:
+                            failed.append((row, e))
+                        done += 1
+                        progress.progress(done / total_steps)
+
+                # Stage 2: send emails, logging each one as it completes
                 sent_count = 0
-                for i in selected_rows:
-                    row = df_paid.loc[i]
-                    invoice_id = create_invoice(conn, row)
-
-                    pdf_path = generate_invoice_pdf(
-                        conn=conn,
-                        invoice_id=invoice_id,
-                        resident_name=row['resident_name'],
-                        apartment=row['apartment_number'],
-                        amount=row['amount_paid'],
-                        payment_date=row['payment_date'].strftime('%Y-%m-%d'),
-                        charge_month=row['charge_month'],
-                        building_id=row['building_id'],
-                        payment_method=row['method']
-                    )
-
-                    send_invoice_email(
-                        receiver_email=row['email'],
-                        subject=T("invoice_email_subject").format(invoice_id=invoice_id),
-                        body=T("invoice_email_body").format(resident_name=row['resident_name']),
-                        attachment_path=pdf_path
-                    )
-
-                    log_invoice_send(conn, invoice_id, row['email'])
-                    sent_count += 1
-
-                st.success(T("invoices_sent_success").format(count=sent_count))
+                with ThreadPoolExecutor(max_workers=EMAIL_WORKERS) as executor:
+                    futures = {
+                        executor.submit(
+                            send_invoice_email,
+                            receiver_email=row['email'],
+                            subject=T("invoice_email_subject").format(invoice_id=invoice_id),
+                            body=T("invoice_email_body").format(resident_name=row['resident_name']),
+                            attachment_path=pdf_path,
+                        ): (row, invoice_id)
+                        for row, invoice_id, pdf_path in rendered
+                    }
+                    for future in as_completed(futures):
+                        row, invoice_id = futures[future]
+                        try:
+                            future.result()
+                        except Exception as e:
+                            failed.append((row, e))
+                        else:
+                            log_invoice_send(conn, invoice_id, row['email'])
+                            sent_count += 1
+                        done += 1
+                        progress.progress(done / total_steps)
+                progress.progress(1.0)
+
+                _cached_get_paid_transactions.clear()
+                if sent_count:
+                    st.success(T("invoices_sent_success").format(count=sent_count))
+                for row, error in failed:
+                    st.error(T("invoice_send_failed").format(
+                        apartment=row['apartment_number'], error=error))
 
     if df_paid.empty:
         st.info(T("no_paid_transactions"))
     else:
         st.subheader("✅ " + T("paid_transactions"))
 
-        for idx, row in df_paid.iterrows():
-            indicator = T("invoice_sent_short") if row.get("invoice_sent") else ""
-            header = (
-                f"🏠 {T('apt_header')} {row['apartment_number']} — {row['resident_name']} — ₪{row['amount_paid']}"
-            )
-            if indicator:
-                header = f"{indicator} " + header
-
-            with st.expander(header):
-                st.markdown(f"**{T('building_label')}:** {row['building_name']}")
-                st.markdown(f"**{T('resident')}:** {row['resident_name']}")
-                st.markdown(f"**{T('email')}:** {row['email']}")
-                st.markdown(f"**{T('for_month')}:** {row['charge_month'].strftime('%B %Y')}")
-                st.markdown(f"**{T('payment_date')}:** {row['payment_date'].strftime('%Y-%m-%d')}")
-                lang = st.session_state.get('lang', 'en')
-                method_display = translate_payment_method(row['method'], lang)
-                st.markdown(f"**{T('payment_method')}:** {method_display}")
-
-                col1, col2, col3 = st.columns([1, 1, 1])
-
-                with col1:
-                    if st.button("👁️ " + T("view_invoice"), key=f"view_{row['transaction_id']}"):
-                        pdf_path = generate_invoice_pdf(
-                            conn=conn,
-                            invoice_id=row['transaction_id'],
-                            resident_name=row['resident_name'],
-                            apartment=row['apartment_number'],
-                            amount=row['amount_paid'],
-                            payment_date=row['payment_date'].strftime('%Y-%m-%d'),
-                            charge_month=row['charge_month'],
-                            building_id=row['building_id'],
-                            payment_method=row['method']
-                        )
-
-                        with open(pdf_path, "rb") as f:
-                            base64_pdf = base64.b64encode(f.read()).decode('utf-8')
-                            pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="100%" height="600px" type="application/pdf"></iframe>'
-                            st.markdown(pdf_display, unsafe_allow_html=True)
-
-                with col2:
-                    if st.button("📤 " + T("send_invoice"), key=f"send_{row['transaction_id']}"):
-                        invoice_id = create_invoice(conn, row)
-
-                        pdf_path = generate_invoice_pdf(
-                            conn=conn,
-                            invoice_id=invoice_id,
-                            resident_name=row['resident_name'],
-                            apartment=row['apartment_number'],
-                            amount=row['amount_paid'],
-                            payment_date=row['payment_date'].strftime('%Y-%m-%d'),
-                            charge_month=row['charge_month'],
-                            building_id=row['building_id'],
-                            payment_method=row['method']
-                        )
-
-                        send_invoice_email(
-                            receiver_email=row['email'],
-                            subject=T("invoice_email_subject").format(invoice_id=invoice_id),
-                            body=T("invoice_email_body").format(resident_name=row['resident_name']),
-                            attachment_path=pdf_path
-                        )
-
-                        log_invoice_send(conn, invoice_id, row['email'])
-                        st.success(T("invoice_sent_to").format(invoice_id=invoice_id, email=row['email']))
-
-                with col3:
-                    btn_key = f"download_{row['transaction_id']}_generate"
-                    if st.button("⬇️ " + T("download_invoice"), key=btn_key):
-                        pdf_path = generate_invoice_pdf(
-                            conn=conn,
-                            invoice_id=row['transaction_id'],
-                            resident_name=row['resident_name'],
-                            apartment=row['apartment_number'],
-                            amount=row['amount_paid'],
-                            payment_date=row['payment_date'].strftime('%Y-%m-%d'),
-                            charge_month=row['charge_month'],
-                            building_id=row['building_id'],
-                            payment_method=row['method']
-                        )
-
-                        with open(pdf_path, "rb") as f:
-                            st.download_button(
-                                "⬇️ " + T("download_invoice"),
-                                data=f.read(),
-                                file_name=os.path.basename(pdf_path),
-                                mime="application/pdf",
-                                key=f"download_{row['transaction_id']}"
-                            )
+        for row in df_paid.to_dict("records"):
+            _paid_row(conn, T, row, lang)
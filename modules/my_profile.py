@@ -1,8 +1,52 @@
 """Page for updating a user's personal profile."""
 
+import html
+from concurrent.futures import ThreadPoolExecutor
+from string import Template
+import pandas as pd
 import streamlit as st
-import bcrypt
-from modules.db_tools.crud_operations import get_user_by_username
+from psycopg2.extras import execute_values
+from modules.db_tools.crud_operations import (
+    export_building_data,
+    get_assigned_buildings,
+    get_user_by_username,
+    hash_password,
+)
+
+# Invoice-footer preview card for one building
+_CARD_TEMPLATE = Template("""
+    <div style='
+        background-color: #f0f8ff;
+        border-radius: 12px;
+        padding: 15px;
+        margin-bottom: 15px;
+        border: 1px solid #d0e6f7;
+        font-size: 16px;
+    '>
+        🏢 <strong>$header</strong><br>
+        📇 $contact
+    </div>
+    """)
+
+# Argon2 releases the GIL, so hashing in a worker keeps the script thread free
+_HASH_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
+
+def _submit_password_hash(password):
+    """Start hashing ``password`` in the background and return the future.
+
+    Only the future is kept in session state; nothing derived from the
+    plaintext is stored.
+    """
+    future = _HASH_EXECUTOR.submit(hash_password, password)
+    st.session_state["pw_hash_future"] = future
+    return future
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_buildings(_conn, user_id):
+    """Cached ``get_assigned_buildings`` keyed on ``user_id``."""
+    return get_assigned_buildings(_conn, user_id)
 
 
 def render(conn, T):
@@ -10,106 +54,135 @@ def render(conn, T):
     st.header("👤 " + T("my_profile"))
 
     username = st.session_state.username
-    user = get_user_by_username(conn, username)
+    # the user row only changes on save, so keep it across reruns
+    cached = st.session_state.get("_user_row")
+    if cached is not None and cached[0] == username:
+        user = cached[1]
+    else:
+        user = get_user_by_username(conn, username)
+        st.session_state["_user_row"] = (username, user)
 
     if not user:
         st.error(T("user_not_found"))
         return
 
-    from modules.db_tools.crud_operations import get_user_building_ids
-
-    ...
-
     user_id = user[0]
     current_email = user[3]
-    assigned_building_ids = get_user_building_ids(conn, user_id)
 
     # We'll let the rep edit contact info for all assigned buildings
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT building_id, building_name, contact_phone, contact_email
-            FROM buildings WHERE building_id = ANY(%s)
-        """, (assigned_building_ids,))
-        buildings_info = cur.fetchall()
+    buildings_info = _load_buildings(conn, user_id)
 
     if not buildings_info:
         st.info(T("no_buildings_assigned"))
         return
 
+    building_map = {b_id: name for b_id, name, *_ in buildings_info}
+
     new_email = st.text_input(T("your_email_label"), value=current_email)
     new_password = st.text_input(T("new_password_optional"), type="password")
 
-    # Collect phone updates
-    updated_contacts = []
+    # Collect phone updates in one editable grid
     st.subheader(T("building_contact_info_title"))
-    for building_id, name, phone, email in buildings_info:
-        st.markdown(f"**🏢 {name}**")
-        new_phone = st.text_input(T("phone_for_building").format(name=name), value=phone or "", key=f"phone_{building_id}")
-        new_contact_email = st.text_input(T("contact_email_for_building").format(name=name), value=email or "", key=f"email_{building_id}")
-        updated_contacts.append((building_id, new_phone, new_contact_email))
+    contacts_df = pd.DataFrame(
+        buildings_info, columns=["building_id", "name", "phone", "email"]
+    ).fillna({"phone": "", "email": ""})
+    edited = st.data_editor(
+        contacts_df,
+        disabled=["building_id", "name"],
+        column_config={
+            "building_id": None,
+            "name": st.column_config.TextColumn("🏢 " + T("building_label")),
+            "phone": st.column_config.TextColumn("📱 " + T("phone_label")),
+            "email": st.column_config.TextColumn("📨 " + T("contact_email_label")),
+        },
+        hide_index=True,
+        use_container_width=True,
+        key="contacts_editor",
+    )
+    # native Python values so psycopg2 can adapt them
+    updated_contacts = list(zip(
+        edited["building_id"].astype(int).tolist(),
+        edited["phone"].fillna("").tolist(),
+        edited["email"].fillna("").tolist(),
+    ))
 
     if st.button(T("save_changes_btn")):
+        # Start hashing first so it overlaps the buildings round-trip below
+        future = _submit_password_hash(new_password) if new_password else None
+
         try:
             with conn.cursor() as cur:
-                cur.execute("UPDATE users SET email = %s WHERE user_id = %s", (new_email, user_id))
-
-                if new_password:
-                    hashed = bcrypt.hashpw(new_password.encode(), bcrypt.gensalt()).decode()
-                    cur.execute("UPDATE users SET password_hash = %s WHERE user_id = %s", (hashed, user_id))
-
-                for building_id, phone, email in updated_contacts:
-                    cur.execute("""
-                        UPDATE buildings
-                        SET contact_phone = %s,
-                            contact_email = %s
-                        WHERE building_id = %s
-                    """, (phone, email, building_id))
+                execute_values(cur, """
+                    UPDATE buildings
+                    SET contact_phone = data.phone,
+                        contact_email = data.email
+                    FROM (VALUES %s) AS data (bid, phone, email)
+                    WHERE building_id = data.bid
+                """, updated_contacts)
+
+                hashed = None
+                if future is not None:
+                    with st.spinner(T("hashing")):
+                        hashed = future.result()
+
+                # hashed is None when the password is unchanged
+                cur.execute("""
+                    UPDATE users
+                    SET email = %s,
+                        password_hash = COALESCE(%s, password_hash)
+                    WHERE user_id = %s
+                """, (new_email, hashed, user_id))
 
                 conn.commit()
+            _load_buildings.clear()
+            st.session_state.pop("_user_row", None)
+            st.session_state.pop("pw_hash_future", None)
             st.success(T("profile_updated"))
         except Exception as e:
+            # leave the session's connection usable for the next rerun
+            conn.rollback()
+            st.session_state.pop("pw_hash_future", None)
             st.error(T("failed_to_update").format(error=e))
 
     st.markdown("---")
     st.subheader(T("invoice_footer_preview"))
 
-    for building_id, phone, email in updated_contacts:
-        with conn.cursor() as cur:
-            cur.execute("SELECT building_name FROM buildings WHERE building_id = %s", (building_id,))
-            name = cur.fetchone()[0] if cur.rowcount else T("unknown_building")
-
-        contact_display = f"{phone} | {email}" if phone or email else "—"
-
-        st.markdown(f"""
-        <div style='
-            background-color: #f0f8ff;
-            border-radius: 12px;
-            padding: 15px;
-            margin-bottom: 15px;
-            border: 1px solid #d0e6f7;
-            font-size: 16px;
-        '>
-            🏢 <strong>{T('in_building_footer_preview').format(name=name)}</strong><br>
-            📇 {contact_display}
-        </div>
-        """, unsafe_allow_html=True)
+    # one markdown element for all cards, rebuilt only when the inputs change
+    preview_key = hash((
+        st.session_state.get("lang", "en"),
+        tuple(updated_contacts),
+        tuple(building_map.items()),
+    ))
+    if st.session_state.get("_contacts_hash") != preview_key:
+        cards = []
+        for building_id, phone, email in updated_contacts:
+            # user-entered values go into unsafe HTML, so escape them
+            name = html.escape(building_map.get(building_id, T("unknown_building")))
+            contact_display = (
+                f"{html.escape(phone)} | {html.escape(email)}" if phone or email else "—"
+            )
+
+            cards.append(_CARD_TEMPLATE.substitute(
+                header=T('in_building_footer_preview').format(name=name),
+                contact=contact_display,
+            ))
+        st.session_state["_preview_html"] = "".join(cards)
+        st.session_state["_contacts_hash"] = preview_key
+    st.markdown(st.session_state["_preview_html"], unsafe_allow_html=True)
 
     st.markdown("---")
     st.subheader(T("download_my_data_csv"))
-    building_map = {b_id: name for b_id, name, *_ in buildings_info}
     selected_b_id = st.selectbox(
         T("select_building"),
-        options=list(building_map.keys()),
-        format_func=lambda x: building_map[x],
+        options=tuple(building_map),
+        format_func=building_map.__getitem__,
     )
 
     if st.button(T("download_csv")):
-        from modules.db_tools.crud_operations import export_building_data
-
         zip_buffer = export_building_data(conn, selected_b_id)
         st.download_button(
             T("download_my_data_csv"),
-            zip_buffer.getvalue(),
+            zip_buffer,
             file_name=f"building_{selected_b_id}_data.zip",
             mime="application/zip",
         )
@@ -2,25 +2,139 @@
 
 import streamlit as st
 import datetime
+import weakref
 import pandas as pd
+from psycopg2.extras import execute_values
 from modules.db_tools.crud_operations import (
     get_user_by_username,
-    get_user_id,
     add_building,
     get_apartments_by_building,
     get_residents_by_building_full,
+    get_residents_summary,
     set_active_resident,
     add_expense,
     get_buildings,
     get_suppliers,
-    get_expenses,
+    get_expenses_by_building,
     delete_expense,
     update_expense,
+    hash_password,
 )
+from modules.db_tools.filters import clear_building_cache
 from modules.utils.localization import get_translation
 from modules.utils.language import setup_language_selector
 
 
+# Expense statuses in dropdown order, with each status's position
+_STATUS_OPTIONS = ("pending", "paid", "cancelled")
+_STATUS_IDX = {s: i for i, s in enumerate(_STATUS_OPTIONS)}
+
+# Connections on which the wizard's hot queries have been PREPAREd
+_PREPARED_CONNS = weakref.WeakSet()
+
+
+def _ensure_prepared(conn):
+    """PREPARE the wizard's repeated queries once per connection."""
+    if conn in _PREPARED_CONNS:
+        return
+    with conn.cursor() as cur:
+        cur.execute("""
+            PREPARE wiz_buildings_by_user (int) AS
+            SELECT b.building_name, b.city, b.street, b.home_number
+            FROM buildings b
+            JOIN user_buildings ub ON b.building_id = ub.building_id
+            WHERE ub.user_id = $1
+            ORDER BY b.building_name
+        """)
+        cur.execute("""
+            PREPARE wiz_txn_summary (int) AS
+            SELECT t.transaction_id, a.apartment_number, r.first_name || ' ' || r.last_name AS resident_name,
+                   t.charge_month, t.payment_date, t.amount_paid, t.method
+            FROM transactions t
+            JOIN apartments a ON t.apartment_id = a.apartment_id
+            JOIN residents r ON t.resident_id = r.resident_id
+            WHERE a.building_id = $1
+            ORDER BY t.payment_date DESC
+        """)
+    _PREPARED_CONNS.add(conn)
+
+
+# Reads are cached so typing in a widget does not re-query the database;
+# each write below clears the caches it affects. Connections are not hashed.
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_user_buildings(_conn, user_id):
+    """Buildings assigned to ``user_id`` for the step-2 table."""
+    _ensure_prepared(_conn)
+    with _conn.cursor() as cur:
+        cur.execute("EXECUTE wiz_buildings_by_user (%s)", (int(user_id),))
+        return cur.fetchall()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_buildings(_conn):
+    """Cached ``get_buildings``."""
+    return get_buildings(_conn)
+
+
+def _active_building_id(conn):
+    """Return the building the wizard is populating.
+
+    Step 2 stores the id it creates in session state; before that the most
+    recently added building is used, or ``None`` when there is none.
+    """
+    building_id = st.session_state.get("active_building_id")
+    if building_id is None:
+        df_buildings = _cached_buildings(conn)
+        if df_buildings.empty:
+            return None
+        building_id = int(df_buildings.iloc[-1]["building_id"])
+    return building_id
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_apartments(_conn, building_id):
+    """Cached ``get_apartments_by_building`` keyed on the building."""
+    return get_apartments_by_building(_conn, building_id)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_residents(_conn, building_id):
+    """Cached ``get_residents_by_building_full`` keyed on the building."""
+    return get_residents_by_building_full(_conn, building_id)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_residents_summary(_conn, building_id):
+    """Cached ``get_residents_summary`` keyed on the building."""
+    return get_residents_summary(_conn, building_id)
+
+
+def _clear_resident_caches():
+    """Drop cached resident reads after a write."""
+    _cached_residents.clear()
+    _cached_residents_summary.clear()
+
+
+def _bounded_dataframe(df, limit, T, tail=False, **kwargs):
+    """Show at most ``limit`` rows of ``df`` and say so when rows are cut."""
+    shown = df.tail(limit) if tail else df.head(limit)
+    st.dataframe(shown, **kwargs)
+    if len(df) > limit:
+        st.caption(T("table_rows_truncated").format(shown=limit, total=len(df)))
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_suppliers(_conn):
+    """Cached ``get_suppliers``."""
+    return get_suppliers(_conn)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_expenses(_conn, building_id):
+    """Cached ``get_expenses_by_building`` keyed on ``building_id``."""
+    return get_expenses_by_building(_conn, building_id)
+
+
 def render(conn):
     """Guide new users through populating initial data."""
     setup_language_selector(key="language_selector_wizard")
@@ -40,16 +154,24 @@ def render(conn):
     if step == 1:
         st.subheader(T("update_contact_info"))
         st.info(T("step1_instruction"))
-        new_email = st.text_input(T("your_email_label"), value=user[3])
-        new_password = st.text_input(T("new_password_label"), type="password")
-
-        if st.button(T("save_contact_info_btn")):
+        # inputs are batched so typing does not rerun the page
+        with st.form("contact_form"):
+            new_email = st.text_input(T("your_email_label"), value=user[3])
+            new_password = st.text_input(T("new_password_label"), type="password")
+            submitted = st.form_submit_button(T("save_contact_info_btn"))
+
+        if submitted:
+            hashed = None
+            if new_password:
+                with st.spinner(T("hashing")):
+                    hashed = hash_password(new_password)
             with conn.cursor() as cur:
-                cur.execute("UPDATE users SET email = %s WHERE user_id = %s", (new_email, user[0]))
-                if new_password:
-                    import bcrypt
-                    hashed = bcrypt.hashpw(new_password.encode(), bcrypt.gensalt()).decode()
-                    cur.execute("UPDATE users SET password_hash = %s WHERE user_id = %s", (hashed, user[0]))
+                # hashed is None when the password is unchanged
+                cur.execute("""
+                    UPDATE users
+                    SET email = %s, password_hash = COALESCE(%s, password_hash)
+                    WHERE user_id = %s
+                """, (new_email, hashed, user[0]))
                 conn.commit()
             st.success(T("contact_info_updated"))
             completed[1] = True
@@ -65,44 +187,25 @@ def render(conn):
         st.info(T("step2_instruction"))
         st.markdown("### " + T("your_buildings_header"))
 
-        user_id = get_user_id(conn, st.session_state["username"])
-
-        with conn.cursor() as cur:
-
-            cur.execute("""
-
-                SELECT b.building_name, b.city, b.street, b.home_number
+        user_id = user[0]
 
-                FROM buildings b
-
-                JOIN user_buildings ub ON b.building_id = ub.building_id
-
-                WHERE ub.user_id = %s
-
-                ORDER BY b.building_name;
-
-            """, (user_id,))
-
-            rows = cur.fetchall()
+        rows = _cached_user_buildings(conn, user_id)
 
         df = pd.DataFrame(rows, columns=["Name", "City", "Street", "Home Number"])
 
-        st.dataframe(df, use_container_width=True)
-        name = st.text_input(T("building_name_label"))
-
-        city = st.text_input(T("city_label"))
-
-        street = st.text_input(T("street_label"))
-
-        home_number = st.text_input(T("home_number_label"))
+        # only a bounded slice is sent to the browser
+        _bounded_dataframe(df, 20, T, tail=True, use_container_width=True)
+        with st.form("bldg_form"):
+            name = st.text_input(T("building_name_label"))
+            city = st.text_input(T("city_label"))
+            street = st.text_input(T("street_label"))
+            home_number = st.text_input(T("home_number_label"))
+            submitted = st.form_submit_button(T("add_building_btn"))
 
-        if st.button(T("add_building_btn")):
+        if submitted:
             building_id = add_building(conn, name, city, street, home_number)
 
             # Assign to current user
-
-            user_id = get_user_id(conn, st.session_state["username"])
-
             with conn.cursor() as cur:
                 cur.execute("""
 
@@ -116,6 +219,12 @@ def render(conn):
 
                 conn.commit()
 
+            st.session_state["active_building_id"] = building_id
+
+            clear_building_cache()
+            _cached_user_buildings.clear()
+            _cached_buildings.clear()
+
             st.success(T("building_added_assigned_you"))
 
             completed[2] = True
@@ -136,26 +245,33 @@ def render(conn):
     elif step == 3:
         st.subheader(T("add_apartments_title"))
         st.info(T("step3_instruction"))
-        df_buildings = get_buildings(conn)
-        building_id = int(df_buildings.iloc[-1]["building_id"])
-        start_apt = int(st.number_input(T("from_apartment_number"), min_value=1, value=1))
-        end_apt = int(st.number_input(T("to_apartment_number"), min_value=start_apt, value=start_apt + 5))
-        start_floor = int(st.number_input(T("starting_floor"), step=1, value=0))
-        per_floor = int(st.number_input(T("apartments_per_floor"), min_value=1, value=3))
-
-        if st.button(T("submit_bulk_apartments")):
+        building_id = _active_building_id(conn)
+        with st.form("apartments_form"):
+            start_apt = int(st.number_input(T("from_apartment_number"), min_value=1, value=1))
+            # a fixed min_value and key keep this widget's value across submits
+            end_apt = int(st.number_input(T("to_apartment_number"), min_value=1, value=6, key="wiz_end_apt"))
+            start_floor = int(st.number_input(T("starting_floor"), step=1, value=0))
+            per_floor = int(st.number_input(T("apartments_per_floor"), min_value=1, value=3))
+            submitted = st.form_submit_button(T("submit_bulk_apartments"))
+
+        if submitted and end_apt < start_apt:
+            st.error(T("end_apartment_before_start"))
+        elif submitted:
             with conn.cursor() as cur:
+                # a row comes back only when apartment 0 is newly created
                 cur.execute("""
-                    SELECT apartment_id FROM apartments
-                    WHERE building_id = %s AND apartment_number = '0'
-                """, (building_id,))
+                    INSERT INTO apartments (building_id, floor, apartment_number)
+                    SELECT %s, 0, '0'
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM apartments
+                        WHERE building_id = %s AND apartment_number = '0'
+                    )
+                    ON CONFLICT DO NOTHING
+                    RETURNING apartment_id
+                """, (building_id, building_id))
                 apt_0 = cur.fetchone()
-                if not apt_0:
-                    cur.execute("""
-                        INSERT INTO apartments (building_id, floor, apartment_number)
-                        VALUES (%s, %s, %s) RETURNING apartment_id
-                    """, (building_id, 0, '0'))
-                    apt_0_id = cur.fetchone()[0]
+                if apt_0 is not None:
+                    apt_0_id = apt_0[0]
                     cur.execute("""
                         INSERT INTO residents (
                             apartment_id, role, first_name, last_name, phone, email,
@@ -164,22 +280,28 @@ def render(conn):
                     """, (
                         apt_0_id, "owner", "System", "Resident", "00000", "system@vaad.com",
                         datetime.date.today()))
-                for i, apt_num in enumerate(range(start_apt, end_apt + 1)):
-                    floor = int(start_floor + (i // per_floor))
-                    cur.execute("""
-                        INSERT INTO apartments (building_id, floor, apartment_number)
-                        VALUES (%s, %s, %s) RETURNING apartment_id
-                    """, (building_id, floor, str(apt_num)))
-                    apartment_id = cur.fetchone()[0]
-                    cur.execute("""
-                        INSERT INTO residents (
-                            apartment_id, role, first_name, last_name, phone, email,
-                            start_date, is_active
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, TRUE)
-                    """, (
-                        apartment_id, "owner", "System", "Resident", "00000", "system@vaad.com",
-                        datetime.date.today()))
+                # the inputs are already ints, so no per-row casts are needed
+                n = end_apt - start_apt + 1
+                floors = [start_floor + i // per_floor for i in range(n)]
+                numbers = [str(x) for x in range(start_apt, end_apt + 1)]
+                apt_rows = list(zip([building_id] * n, floors, numbers))
+                apt_ids = execute_values(cur, """
+                    INSERT INTO apartments (building_id, floor, apartment_number)
+                    VALUES %s RETURNING apartment_id
+                """, apt_rows, fetch=True)
+                today = datetime.date.today()
+                execute_values(cur, """
+                    INSERT INTO residents (
+                        apartment_id, role, first_name, last_name, phone, email,
+                        start_date, is_active
+                    ) VALUES %s
+                """, [
+                    (apartment_id, "owner", "System", "Resident", "00000", "system@vaad.com", today, True)
+                    for (apartment_id,) in apt_ids
+                ])
                 conn.commit()
+            _cached_apartments.clear()
+            _clear_resident_caches()
             st.success(T("apartments_added"))
             completed[3] = True
             st.session_state.wizard_completed = completed
@@ -222,14 +344,13 @@ def render(conn):
     elif step == 4:
         st.subheader(T("add_residents_title"))
         st.info(T("step4_instruction"))
-        df_buildings = get_buildings(conn)
-        building_id = int(df_buildings.iloc[-1]["building_id"])
-        apartments = get_apartments_by_building(conn, building_id)
-        apt_map = {
-            f"{T('apt_header')} {row['apartment_number']}": row['apartment_id']
-            for _, row in apartments.iterrows()
-            if row['apartment_number'] != '0'
-        }
+        building_id = _active_building_id(conn)
+        apartments = _cached_apartments(conn, building_id)
+        real_apts = apartments[apartments["apartment_number"] != "0"]
+        apt_map = dict(zip(
+            T("apt_header") + " " + real_apts["apartment_number"].astype(str),
+            real_apts["apartment_id"],
+        ))
 
         apt_options = list(apt_map.keys())
 
@@ -271,6 +392,7 @@ def render(conn):
                         (apartment_id,),
                     )
                     conn.commit()
+                _clear_resident_caches()
                 st.success(T("residents_deleted"))
                 st.session_state[f"residents_done_{apartment_id}"] = False
                 st.rerun()
@@ -297,26 +419,21 @@ def render(conn):
                 # cur.execute("DELETE FROM residents WHERE apartment_id = %s",
                 #             (apartment_id,))  # Replace any existing residents
 
-                cur.execute("""
+                today = datetime.date.today()
+                renter = (renter_first_name, renter_last_name, renter_phone, renter_email)
+                owner = renter if same_as_owner else (
+                    owner_first_name, owner_last_name, owner_phone, owner_email
+                )
+                execute_values(cur, """
                     INSERT INTO residents (apartment_id, role, first_name, last_name, phone, email, start_date, is_active)
-                    VALUES (%s,%s,%s,%s,%s,%s,%s,FALSE)
-                """, (apartment_id, "renter", renter_first_name, renter_last_name, renter_phone, renter_email,
-                      datetime.date.today()))
-
-                if same_as_owner:
-                    cur.execute("""
-                        INSERT INTO residents (apartment_id, role, first_name, last_name, phone, email, start_date, is_active)
-                        VALUES (%s,%s,%s,%s,%s,%s,%s,FALSE)
-                    """, (apartment_id, "owner", renter_first_name, renter_last_name, renter_phone, renter_email,
-                          datetime.date.today()))
-                else:
-                    cur.execute("""
-                        INSERT INTO residents (apartment_id, role, first_name, last_name, phone, email, start_date, is_active)
-                        VALUES (%s,%s,%s,%s,%s,%s,%s,FALSE)
-                    """, (apartment_id, "owner", owner_first_name, owner_last_name, owner_phone, owner_email,
-                          datetime.date.today()))
+                    VALUES %s
+                """, [
+                    (apartment_id, "renter", *renter, today, False),
+                    (apartment_id, "owner", *owner, today, False),
+                ])
 
                 conn.commit()
+            _clear_resident_caches()
             st.success(T("residents_added_for").format(apt_label=apt_label))
             completed[4] = True
             st.session_state.wizard_completed = completed
@@ -324,9 +441,8 @@ def render(conn):
 
         st.markdown("---")
         st.markdown("### " + T("summary_table_title"))
-        summary_df = get_residents_by_building_full(conn, building_id)
-        st.dataframe(summary_df[["apartment_number", "first_name", "last_name", "role", "is_active"]].sort_values(
-            by="apartment_number"))
+        summary_df = _cached_residents_summary(conn, building_id)
+        _bounded_dataframe(summary_df, 100, T, tail=True)
 
         if completed.get(4):
             st.info(T("residents_step_completed"))
@@ -358,20 +474,20 @@ def render(conn):
     elif step == 5:
         st.subheader(T("set_active_residents_title"))
         st.info(T("step5_instruction"))
-        df_buildings = get_buildings(conn)
-        building_id = int(df_buildings.iloc[-1]["building_id"])
-        df_residents = get_residents_by_building_full(conn, building_id)
-
-        for _, row in df_residents.iterrows():
-            if not row["is_active"]:
-                apt_num = row.get("apartment_number", "?")
-                name = f"{row['first_name']} {row['last_name']}"
-                btn_label = T("set_active_resident_for_apartment").format(name=name, apt_num=apt_num)
-                btn_key = f"set_active_{row['resident_id']}"
-                if st.button(btn_label, key=btn_key):
-                    set_active_resident(conn, row["resident_id"], row["apartment_id"])
-                    st.success(T("resident_now_active_for_apartment").format(name=name, apt_num=apt_num))
-                    st.rerun()
+        building_id = _active_building_id(conn)
+        df_residents = _cached_residents(conn, building_id)
+
+        inactive = df_residents[~df_residents["is_active"].fillna(False).astype(bool)]
+        for row in inactive.to_dict("records"):
+            apt_num = row.get("apartment_number", "?")
+            name = f"{row['first_name']} {row['last_name']}"
+            btn_label = T("set_active_resident_for_apartment").format(name=name, apt_num=apt_num)
+            btn_key = f"set_active_{row['resident_id']}"
+            if st.button(btn_label, key=btn_key):
+                set_active_resident(conn, row["resident_id"], row["apartment_id"])
+                _clear_resident_caches()
+                st.success(T("resident_now_active_for_apartment").format(name=name, apt_num=apt_num))
+                st.rerun()
 
         completed[5] = True
         st.session_state.wizard_completed = completed
@@ -383,16 +499,21 @@ def render(conn):
     elif step == 6:
         st.subheader(T("set_monthly_fees_title"))
         st.info(T("step6_instruction"))
-        df_buildings = get_buildings(conn)
-        building_id = int(df_buildings.iloc[-1]["building_id"])
-        new_fee = st.number_input(T("new_monthly_fee"), min_value=0.0, step=50.0)
+        building_id = _active_building_id(conn)
+        with st.form("fee_form"):
+            new_fee = st.number_input(T("new_monthly_fee"), min_value=0.0, step=50.0)
+            submitted = st.form_submit_button(T("apply_fee_btn"))
 
-        if st.button(T("apply_fee_btn")):
+        if submitted:
+            # one upsert covers apartments with and without a fee row
             with conn.cursor() as cur:
                 cur.execute("""
-                    UPDATE apartment_charge_settings
-                    SET monthly_fee = %s
-                    WHERE building_id = %s;
+                    INSERT INTO apartment_charge_settings (apartment_id, building_id, monthly_fee, charge_type)
+                    SELECT a.apartment_id, a.building_id, %s, 'monthly fee'
+                    FROM apartments a
+                    WHERE a.building_id = %s AND a.apartment_number <> '0'
+                    ON CONFLICT (apartment_id) DO UPDATE
+                    SET monthly_fee = EXCLUDED.monthly_fee;
                 """, (new_fee, building_id))
                 conn.commit()
             st.success(T("fees_updated"))
@@ -447,16 +568,16 @@ def render(conn):
         st.subheader(T("add_transactions_title"))
         st.info(T("step7_instruction"))
         st.info(T("transactions_step_info"))
-        df_buildings = get_buildings(conn)
-        building_id = int(df_buildings.iloc[-1]["building_id"])
-        df_residents = get_residents_by_building_full(conn, building_id)
-        df_apartments = get_apartments_by_building(conn, building_id)
+        building_id = _active_building_id(conn)
+        df_residents = _cached_residents(conn, building_id)
+        df_apartments = _cached_apartments(conn, building_id)
 
         apartment_id = st.selectbox(T("apartment_label"), df_apartments["apartment_number"], key="txn_apt")
         filtered = df_apartments[df_apartments["apartment_number"] == apartment_id]
 
         if filtered.empty:
-            df_apartments = get_apartments_by_building(conn, building_id)
+            _cached_apartments.clear()
+            df_apartments = _cached_apartments(conn, building_id)
 
             if df_apartments.empty:
                 st.warning(T("no_apartments_step3_warning"))
@@ -480,44 +601,52 @@ def render(conn):
         apt_id = int(apartment_row["apartment_id"])
 
         resident_options = df_residents[df_residents["apartment_id"] == apt_id]
-        resident_name = st.selectbox(T("resident"), resident_options["first_name"] + " " + resident_options["last_name"],
-                                     key="txn_res")
-        resident_id = int(
-            resident_options[resident_options["first_name"] + " " + resident_options["last_name"] == resident_name][
-                "resident_id"].values[0])
-
-        charge_month = st.date_input(T("charge_month_label"))
-        payment_date = st.date_input(T("payment_date"))
-        amount_paid = st.number_input(T("amount_paid"), min_value=0.0)
-        method = st.selectbox(T("payment_method"), ["cash", "credit", "bank transfer", "other"])
-
-        if st.button(T("save_transaction_btn")):
+        full_names = resident_options["first_name"] + " " + resident_options["last_name"]
+        name_to_id = dict(zip(full_names, resident_options["resident_id"]))
+
+        # the apartment picker stays outside so the resident list follows it
+        with st.form("txn_form"):
+            resident_name = st.selectbox(T("resident"), full_names, key="txn_res")
+            charge_month = st.date_input(T("charge_month_label"))
+            payment_date = st.date_input(T("payment_date"))
+            amount_paid = st.number_input(T("amount_paid"), min_value=0.0)
+            method = st.selectbox(T("payment_method"), ["cash", "credit", "bank transfer", "other"])
+            save_clicked = st.form_submit_button(T("save_transaction_btn"))
+
+        resident_id = int(name_to_id[resident_name])
+
+        if save_clicked:
+            st.session_state["txn_dirty"] = True
+
+        # the summary is re-read only after an insert or a building change,
+        # so typing in the inputs above serves the stored frame
+        if (st.session_state.get("txn_dirty", True)
+                or st.session_state.get("txn_building_id") != building_id):
+            # the insert and the summary read share one cursor
+            _ensure_prepared(conn)
             with conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO transactions (apartment_id, resident_id, charge_month, payment_date, amount_paid, method)
-                    VALUES (%s,%s,%s,%s,%s,%s)
-                """, (apt_id, resident_id, charge_month, payment_date, amount_paid, method))
-                conn.commit()
+                if save_clicked:
+                    cur.execute("""
+                        INSERT INTO transactions (apartment_id, resident_id, charge_month, payment_date, amount_paid, method)
+                        VALUES (%s,%s,%s,%s,%s,%s)
+                    """, (apt_id, resident_id, charge_month, payment_date, amount_paid, method))
+                    conn.commit()
+
+                # Optional: display transactions table
+                cur.execute("EXECUTE wiz_txn_summary (%s)", (building_id,))
+                st.session_state["txn_df"] = pd.DataFrame(
+                    cur.fetchall(),
+                    columns=["ID", "Apartment", "Resident", "Charge Month", "Payment Date", "Amount", "Method"])
+            st.session_state["txn_dirty"] = False
+            st.session_state["txn_building_id"] = building_id
+
+        if save_clicked:
             st.success(T("transaction_added"))
             completed[7] = True
             st.session_state.wizard_completed = completed
 
-        # Optional: display transactions table
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT t.transaction_id, a.apartment_number, r.first_name || ' ' || r.last_name AS resident_name,
-                       t.charge_month, t.payment_date, t.amount_paid, t.method
-                FROM transactions t
-                JOIN apartments a ON t.apartment_id = a.apartment_id
-                JOIN residents r ON t.resident_id = r.resident_id
-                WHERE a.building_id = %s
-                ORDER BY t.payment_date DESC
-            """, (building_id,))
-            df_txns = pd.DataFrame(cur.fetchall(),
-                                   columns=["ID", "Apartment", "Resident", "Charge Month", "Payment Date", "Amount",
-                                            "Method"])
-            st.markdown("### " + T("transactions_summary_title"))
-            st.dataframe(df_txns)
+        st.markdown("### " + T("transactions_summary_title"))
+        _bounded_dataframe(st.session_state["txn_df"], 50, T)
 
         if completed.get(7):
             st.info(T("transactions_step_completed"))
@@ -529,17 +658,25 @@ def render(conn):
         st.info(T("step8_instruction"))
         st.info(T("expenses_step_info"))
 
-        df_buildings = get_buildings(conn)
-        df_suppliers = get_suppliers(conn)
+        b_id = _active_building_id(conn)
+        df_suppliers = _cached_suppliers(conn)
 
-        if df_buildings.empty or df_suppliers.empty:
+        if b_id is None or df_suppliers.empty:
             st.warning(T("building_supplier_warning"))
         else:
-            b_id = int(df_buildings.iloc[-1]["building_id"])
-            supplier_options = {s["supplier_name"]: s["supplier_id"] for _, s in df_suppliers.iterrows()}
+            # rebuilt only when the supplier count changes
+            if st.session_state.get("supplier_n") != len(df_suppliers):
+                st.session_state["supplier_options"] = dict(zip(
+                    df_suppliers["supplier_name"].astype(str), df_suppliers["supplier_id"].astype(int)))
+                st.session_state["supplier_names"] = list(st.session_state["supplier_options"])
+                st.session_state["supplier_ids"] = list(st.session_state["supplier_options"].values())
+                st.session_state["supplier_n"] = len(df_suppliers)
+            supplier_options = st.session_state["supplier_options"]
+            supplier_names = st.session_state["supplier_names"]
+            supplier_ids = st.session_state["supplier_ids"]
 
             with st.form("add_expense_form", clear_on_submit=True):
-                selected_supplier = st.selectbox(T("supplier_label"), list(supplier_options.keys()))
+                selected_supplier = st.selectbox(T("supplier_label"), supplier_names)
                 s_id = supplier_options[selected_supplier]
 
                 receipt = st.text_input(T("receipt_id"))
@@ -549,7 +686,7 @@ def render(conn):
                 monthly_cost = st.number_input(T("monthly_cost"), min_value=0.0, step=100.0)
                 payments = int(st.number_input(T("number_of_payments"), min_value=1, step=1))
                 ex_type = st.text_input(T("expense_type"))
-                status = st.selectbox(T("status_label"), ["pending", "paid", "cancelled"])
+                status = st.selectbox(T("status_label"), _STATUS_OPTIONS)
                 notes = st.text_area(T("notes_label"))
 
                 submitted = st.form_submit_button(T("save_expense_btn"))
@@ -558,31 +695,25 @@ def render(conn):
                         conn, b_id, s_id, receipt, start_date, end_date,
                         total_cost, monthly_cost, payments, ex_type, status, notes
                     )
+                    _cached_expenses.clear()
                     st.success(T("expense_added"))
                     completed[8] = True
                     st.session_state.wizard_completed = completed
 
             st.markdown("### " + T("expense_summary_title"))
-            df_expenses = get_expenses(conn)
-
-            # Safely extract building name for current building
-            building_name = df_buildings[df_buildings["building_id"] == b_id]["building_name"].values[0]
-            df_expenses = df_expenses[df_expenses["building_name"] == building_name]
+            df_expenses = _cached_expenses(conn, b_id)
+            supplier_id_to_pos = {sid: i for i, sid in enumerate(supplier_ids)}
 
-            for _, row in df_expenses.iterrows():
+            for row in df_expenses.to_dict("records"):
                 with st.expander(f"🧾 {row['supplier_receipt_id']} – {row['supplier_name']}"):
 
-                    # Ensure the supplier_id from row is an int and exists in the dropdown
-                    supplier_ids = list(supplier_options.values())
-                    try:
-                        supplier_index = supplier_ids.index(int(row["supplier_id"]))
-                    except (ValueError, KeyError):
-                        supplier_index = 0  # fallback if supplier_id is not found
+                    # Ensure the supplier_id from row is an int; unknown ids fall back to the first entry
+                    supplier_index = supplier_id_to_pos.get(int(row["supplier_id"]), 0)
 
                     with st.form(f"edit_expense_{row['expense_id']}"):
                         new_supplier = st.selectbox(
                             "Supplier",
-                            list(supplier_options.keys()),
+                            supplier_names,
                             index=supplier_index,
                             key=f"supp_{row['expense_id']}"
                         )
@@ -599,8 +730,8 @@ def render(conn):
                                                        key=f"pmt_{row['expense_id']}")
                         new_type = st.text_input(T("expense_type"), row["expense_type"], key=f"type_{row['expense_id']}")
                         new_status = st.selectbox(
-                            T("status_label"), ["pending", "paid", "cancelled"],
-                            index=["pending", "paid", "cancelled"].index(row["status"]),
+                            T("status_label"), _STATUS_OPTIONS,
+                            index=_STATUS_IDX.get(row["status"], 0),
                             key=f"sts_{row['expense_id']}"
                         )
                         new_notes = st.text_area(T("notes_label"), row["notes"] or "", key=f"nts_{row['expense_id']}")
@@ -622,11 +753,13 @@ def render(conn):
                                     new_status,
                                     new_notes
                                 )
+                                _cached_expenses.clear()
                                 st.success(T("expense_updated"))
                                 st.rerun()
                         with col2:
                             if st.form_submit_button(T("delete")):
                                 delete_expense(conn, row["expense_id"])
+                                _cached_expenses.clear()
                                 st.warning(T("expense_deleted"))
                                 st.rerun()
 
@@ -1,16 +1,159 @@
 """Reports page with KPIs and detailed financial tables."""
+import codecs
+import functools
+import io
 import streamlit as st
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import datetime
-import plotly.graph_objects as go
-from modules.utils.pdf_generator import generate_report_summary_pdf
 
 from modules.db_tools.crud_operations import (
     get_financial_summary_range,
     get_expense_details_range,
     get_special_transactions_balance,
+    get_monthly_financial_summary,
+    get_monthly_expense_totals,
+    get_monthly_special_balance,
+    get_prior_cumulative_net,
 )
-from modules.db_tools.filters import get_allowed_building_df
+from modules.db_tools.filters import get_allowed_building_map
+from modules.utils.localization import get_translation
+
+
+def _csv_bytes(df):
+    """Encode ``df`` as CSV with a UTF-8 BOM so Excel detects the encoding.
+
+    Arrow's writer encodes straight into the buffer, avoiding the
+    intermediate ``str`` that ``to_csv().encode()`` builds.
+    """
+    df = df.copy()
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            # match to_csv: date-only output when every value is at midnight
+            fmt = "%Y-%m-%d" if (values.dropna() == values.dropna().dt.normalize()).all() \
+                else "%Y-%m-%d %H:%M:%S"
+            df[col] = values.dt.strftime(fmt).astype("string")
+        elif values.dtype == object:
+            # Decimal/date/str mixes (and NaN from the full-report concat)
+            # become plain strings; missing values stay empty cells
+            df[col] = values.astype("string")
+
+    buf = io.BytesIO()
+    buf.write(codecs.BOM_UTF8)
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf)
+    return buf.getvalue()
+
+
+# KPI cards; labels and pre-formatted amounts are filled with format_map
+_KPI_HTML = """
+        <div style='display:flex;flex-wrap:wrap;justify-content:space-between;gap:15px;margin-top:10px;margin-bottom:30px;'>
+          <div style='background-color:#d0f8ce;flex:1 1 0;min-width:160px;max-width:220px;padding:20px;border-radius:12px;box-shadow:0 4px 8px rgba(0,0,0,0.08);text-align:center;'>
+            <div style='font-size:20px;font-weight:500;margin-bottom:8px;'>{label_paid}</div>
+            <div style='font-size:22px;font-weight:bold;'>₪ {paid} / ₪ {expected}</div>
+          </div>
+          <div style='background-color:#fff3e0;flex:1 1 0;min-width:160px;max-width:220px;padding:20px;border-radius:12px;box-shadow:0 4px 8px rgba(0,0,0,0.08);text-align:center;'>
+            <div style='font-size:20px;font-weight:500;margin-bottom:8px;'>{label_expenses}</div>
+            <div style='font-size:22px;font-weight:bold;'>₪ {expenses_paid}</div>
+          </div>
+          <div style='background-color:#fffde7;flex:1 1 0;min-width:160px;max-width:220px;padding:20px;border-radius:12px;box-shadow:0 4px 8px rgba(0,0,0,0.08);text-align:center;'>
+            <div style='font-size:20px;font-weight:500;margin-bottom:8px;'>{label_pending}</div>
+            <div style='font-size:22px;font-weight:bold;'>₪ {expenses_pending}</div>
+          </div>
+          <div style='background-color:#ffcdd2;flex:1 1 0;min-width:160px;max-width:220px;padding:20px;border-radius:12px;box-shadow:0 4px 8px rgba(0,0,0,0.08);text-align:center;'>
+            <div style='font-size:20px;font-weight:500;margin-bottom:8px;'>{label_outstanding}</div>
+            <div style='font-size:22px;font-weight:bold;'>₪ {outstanding}</div>
+          </div>
+          <div style='background-color:#e0f7fa;flex:1 1 0;min-width:160px;max-width:220px;padding:20px;border-radius:12px;box-shadow:0 4px 8px rgba(0,0,0,0.08);text-align:center;'>
+            <div style='font-size:20px;font-weight:500;margin-bottom:8px;'>{label_special}</div>
+            <div style='font-size:22px;font-weight:bold;'>₪ {special}</div>
+          </div>
+          <div style='background-color:#f5f5f5;flex:1 1 0;min-width:160px;max-width:220px;padding:20px;border-radius:12px;box-shadow:0 4px 8px rgba(0,0,0,0.08);text-align:center;'>
+            <div style='font-size:20px;font-weight:500;margin-bottom:8px;'>{label_net}</div>
+            <div style='font-size:22px;font-weight:bold;'>₪ {net}</div>
+          </div>
+          <div style='background-color:#f5f5f5;flex:1 1 0;min-width:160px;max-width:220px;padding:20px;border-radius:12px;box-shadow:0 4px 8px rgba(0,0,0,0.08);text-align:center;'>
+            <div style='font-size:20px;font-weight:500;margin-bottom:8px;'>{label_expected_net}</div>
+            <div style='font-size:22px;font-weight:bold;'>₪ {expected_net}</div>
+          </div>
+        </div>
+"""
+
+_KPI_LABELS = {
+    "label_paid": "kpi_paid",
+    "label_expenses": "kpi_expenses",
+    "label_pending": "kpi_pending_expenses",
+    "label_outstanding": "kpi_left_to_collect",
+    "label_special": "special_transactions",
+    "label_net": "net_balance",
+    "label_expected_net": "expected_net",
+}
+
+
+@functools.lru_cache(maxsize=128)
+def _kpi_html(lang, paid, expected, expenses_paid, expenses_pending,
+              outstanding, special, net, expected_net):
+    """Render the KPI cards for ``lang``; cached on the numbers shown."""
+    T = get_translation(lang)
+    amounts = {
+        "paid": paid,
+        "expected": expected,
+        "expenses_paid": expenses_paid,
+        "expenses_pending": expenses_pending,
+        "outstanding": outstanding,
+        "special": special,
+        "net": net,
+        "expected_net": expected_net,
+    }
+    values = {name: f"{amount:,.0f}" for name, amount in amounts.items()}
+    values.update({slot: T(key) for slot, key in _KPI_LABELS.items()})
+    return _KPI_HTML.format_map(values)
+
+
+# Report queries are cached so reruns from widgets, expanders and download
+# buttons do not hit the database again for the same range.
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
+def _cached_financial_summary(_conn, start, end, building_id, exclude_apartment_0=False):
+    """Cached ``get_financial_summary_range``."""
+    return get_financial_summary_range(_conn, start, end, building_id, exclude_apartment_0)
+
+
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
+def _cached_expense_details(_conn, start, end, building_id, status=None):
+    """Cached ``get_expense_details_range``."""
+    return get_expense_details_range(_conn, start, end, building_id, status=status)
+
+
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
+def _cached_special_balance(_conn, start, end, building_id):
+    """Cached ``get_special_transactions_balance``."""
+    return get_special_transactions_balance(_conn, start, end, building_id)
+
+
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
+def _cached_prior_net(_conn, before, building_id):
+    """Cached ``get_prior_cumulative_net``."""
+    return get_prior_cumulative_net(_conn, before, building_id)
+
+
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
+def _monthly_totals(_conn, start, end, building_id):
+    """Return income, expense and special totals per month.
+
+    The frame is indexed by month start over ``start``..``end``; months
+    without activity are filled with zeros.
+    """
+    df = pd.DataFrame(index=pd.date_range(start, end, freq="MS"))
+    for frame in (
+        get_monthly_financial_summary(_conn, start, end, building_id),
+        get_monthly_expense_totals(_conn, start, end, building_id),
+        get_monthly_special_balance(_conn, start, end, building_id),
+    ):
+        frame["month"] = pd.to_datetime(frame["month"])
+        df = df.join(frame.set_index("month"))
+    return df.fillna(0).astype(float)
 
 
 def render(conn, T):
@@ -20,12 +163,11 @@ def render(conn, T):
     def reset_ready():
         st.session_state["report_ready"] = False
 
-    buildings_df = get_allowed_building_df(conn)
-    if buildings_df.empty:
+    building_map = get_allowed_building_map(conn)
+    if not building_map:
         st.warning(T("no_buildings_assigned"))
         st.stop()
 
-    building_map = {row["building_name"]: row["building_id"] for _, row in buildings_df.iterrows()}
     selected_building_name = st.selectbox(
         "\U0001F3E2 " + T("select_building"),
         list(building_map.keys()),
@@ -110,106 +252,69 @@ def render(conn, T):
     start_dt = pd.to_datetime(start_date)
     end_dt = pd.to_datetime(end_date)
 
-    summary = get_financial_summary_range(
+    summary = _cached_financial_summary(
         conn, start_dt, end_dt, selected_building_id, exclude_apartment_0=True
     )
     paid = summary.at[0, "total_paid"]
     expected = summary.at[0, "total_expected"]
 
-    df_exp_full = get_expense_details_range(conn, start_dt, end_dt, selected_building_id)
-    if expense_status != "All":
-        df_exp_full = df_exp_full[df_exp_full["status"] == expense_status]
-    expenses_paid = df_exp_full[df_exp_full["status"] == "paid"]["cost"].sum()
-    expenses_pending = df_exp_full[df_exp_full["status"] == "pending"]["cost"].sum()
+    df_exp_full = _cached_expense_details(
+        conn,
+        start_dt,
+        end_dt,
+        selected_building_id,
+        status=None if expense_status == "All" else expense_status,
+    )
+    status_sums = df_exp_full.groupby("status", sort=False)["cost"].sum()
+    expenses_paid = status_sums.get("paid", 0)
+    expenses_pending = status_sums.get("pending", 0)
 
     outstanding = expected - paid
-    special_balance = get_special_transactions_balance(conn, start_dt, end_dt, selected_building_id)
+    special_balance = _cached_special_balance(conn, start_dt, end_dt, selected_building_id)
     net_balance = paid - expenses_paid - expenses_pending + special_balance
     expected_net = net_balance + outstanding
 
     st.markdown(
-        f"""
-        <div style='display:flex;flex-wrap:wrap;justify-content:space-between;gap:15px;margin-top:10px;margin-bottom:30px;'>
-          <div style='background-color:#d0f8ce;flex:1 1 0;min-width:160px;max-width:220px;padding:20px;border-radius:12px;box-shadow:0 4px 8px rgba(0,0,0,0.08);text-align:center;'>
-            <div style='font-size:20px;font-weight:500;margin-bottom:8px;'>{T('kpi_paid')}</div>
-            <div style='font-size:22px;font-weight:bold;'>₪ {paid:,.0f} / ₪ {expected:,.0f}</div>
-          </div>
-          <div style='background-color:#fff3e0;flex:1 1 0;min-width:160px;max-width:220px;padding:20px;border-radius:12px;box-shadow:0 4px 8px rgba(0,0,0,0.08);text-align:center;'>
-            <div style='font-size:20px;font-weight:500;margin-bottom:8px;'>{T('kpi_expenses')}</div>
-            <div style='font-size:22px;font-weight:bold;'>₪ {expenses_paid:,.0f}</div>
-          </div>
-          <div style='background-color:#fffde7;flex:1 1 0;min-width:160px;max-width:220px;padding:20px;border-radius:12px;box-shadow:0 4px 8px rgba(0,0,0,0.08);text-align:center;'>
-            <div style='font-size:20px;font-weight:500;margin-bottom:8px;'>{T('kpi_pending_expenses')}</div>
-            <div style='font-size:22px;font-weight:bold;'>₪ {expenses_pending:,.0f}</div>
-          </div>
-          <div style='background-color:#ffcdd2;flex:1 1 0;min-width:160px;max-width:220px;padding:20px;border-radius:12px;box-shadow:0 4px 8px rgba(0,0,0,0.08);text-align:center;'>
-            <div style='font-size:20px;font-weight:500;margin-bottom:8px;'>{T('kpi_left_to_collect')}</div>
-            <div style='font-size:22px;font-weight:bold;'>₪ {outstanding:,.0f}</div>
-          </div>
-          <div style='background-color:#e0f7fa;flex:1 1 0;min-width:160px;max-width:220px;padding:20px;border-radius:12px;box-shadow:0 4px 8px rgba(0,0,0,0.08);text-align:center;'>
-            <div style='font-size:20px;font-weight:500;margin-bottom:8px;'>{T('special_transactions')}</div>
-            <div style='font-size:22px;font-weight:bold;'>₪ {special_balance:,.0f}</div>
-          </div>
-          <div style='background-color:#f5f5f5;flex:1 1 0;min-width:160px;max-width:220px;padding:20px;border-radius:12px;box-shadow:0 4px 8px rgba(0,0,0,0.08);text-align:center;'>
-            <div style='font-size:20px;font-weight:500;margin-bottom:8px;'>{T('net_balance')}</div>
-            <div style='font-size:22px;font-weight:bold;'>₪ {net_balance:,.0f}</div>
-          </div>
-          <div style='background-color:#f5f5f5;flex:1 1 0;min-width:160px;max-width:220px;padding:20px;border-radius:12px;box-shadow:0 4px 8px rgba(0,0,0,0.08);text-align:center;'>
-            <div style='font-size:20px;font-weight:500;margin-bottom:8px;'>{T('expected_net')}</div>
-            <div style='font-size:22px;font-weight:bold;'>₪ {expected_net:,.0f}</div>
-          </div>
-        </div>
-        """,
+        _kpi_html(
+            st.session_state.get("lang", "en"),
+            paid,
+            expected,
+            expenses_paid,
+            expenses_pending,
+            outstanding,
+            special_balance,
+            net_balance,
+            expected_net,
+        ),
         unsafe_allow_html=True,
     )
 
     # ----- Half-Year Summary -----
     st.markdown("#### " + T("half_year_summary"))
 
-    half_year_data = []
-    cumulative_half = 0
-    df_half = pd.DataFrame()
-    for yr in range(start_date.year, end_date.year + 1):
-        for half, months in enumerate([(1, 6), (7, 12)], start=1):
-            start_h = datetime.date(yr, months[0], 1)
-            end_h = datetime.date(yr, months[1], 1)
-            end_h = (pd.to_datetime(end_h) + pd.offsets.MonthEnd(0)).date()
-
-            seg_start = max(start_h, start_date)
-            seg_end = min(end_h, end_date)
-            if seg_start > seg_end:
-                continue
-
-            summ = get_financial_summary_range(
-                conn,
-                seg_start,
-                seg_end,
-                selected_building_id,
-                exclude_apartment_0=True,
-            )
-            expected_h = float(summ.at[0, "total_expected"])
-            paid_h = float(summ.at[0, "total_paid"])
-            expenses_h = float(summ.at[0, "total_expenses"])
-            special_h = get_special_transactions_balance(
-                conn, seg_start, seg_end, selected_building_id
-            )
-            net_h = paid_h - expenses_h + special_h
-            cumulative_half += net_h
-            label = f"H{half} {yr}"
-            half_year_data.append(
-                {
-                    T("half_year"): label,
-                    T("expected_label"): expected_h,
-                    T("kpi_paid"): paid_h,
-                    T("kpi_expenses"): expenses_h,
-                    T("special_transactions"): special_h,
-                    T("net_balance"): net_h,
-                    T("cumulative_value"): cumulative_half,
-                }
-            )
+    # monthly totals for the report range and the 6-month forecast feed both
+    # the half-year summary and the cash-flow tab
+    forecast_end = end_dt + pd.DateOffset(months=6) + pd.offsets.MonthEnd(0)
+    monthly = _monthly_totals(conn, start_dt, forecast_end, selected_building_id)
+    in_range = monthly[(monthly.index >= start_dt) & (monthly.index <= end_dt)]
+
+    halves = in_range.groupby(
+        [in_range.index.year, (in_range.index.month - 1) // 6 + 1]
+    )[["exclude0_expected", "exclude0_paid", "expenses_paid", "special_balance"]].sum()
+    half_net = halves["exclude0_paid"] - halves["expenses_paid"] + halves["special_balance"]
+    df_half = pd.DataFrame(
+        {
+            T("half_year"): [f"H{half} {yr}" for yr, half in halves.index],
+            T("expected_label"): halves["exclude0_expected"].to_numpy(),
+            T("kpi_paid"): halves["exclude0_paid"].to_numpy(),
+            T("kpi_expenses"): halves["expenses_paid"].to_numpy(),
+            T("special_transactions"): halves["special_balance"].to_numpy(),
+            T("net_balance"): half_net.to_numpy(),
+            T("cumulative_value"): half_net.cumsum().to_numpy(),
+        }
+    )
 
-    if half_year_data:
-        df_half = pd.DataFrame(half_year_data)
+    if not df_half.empty:
         st.dataframe(df_half)
 
     tabs = st.tabs([T("transactions"), T("expenses"), T("net_cash_flow_title")])
@@ -237,14 +342,14 @@ def render(conn, T):
             if payment_method != "All":
                 q += " AND t.method = %s"
                 params.append(payment_method)
-            q += " ORDER BY t.payment_date DESC"
+            # chronological order for the running total, so no pandas sort
+            q += " ORDER BY t.payment_date"
             df_trans = pd.read_sql(q, conn, params=params)
             total_paid = 0
             if not df_trans.empty:
                 df_trans["payment_date"] = pd.to_datetime(df_trans["payment_date"], errors="coerce")
-                df_trans = df_trans.sort_values("payment_date")
                 total_paid = df_trans["amount_paid"].sum()
-                df_trans[T("cumulative_value")] = df_trans["amount_paid"].cumsum()
+                df_trans[T("cumulative_value")] = np.cumsum(df_trans["amount_paid"].to_numpy(dtype=np.float64))
                 rename_map = {
                     "apt": T("apartment"),
                     "resident": T("resident_name"),
@@ -275,14 +380,13 @@ def render(conn, T):
             if expense_status != "All":
                 q += " AND e.status = %s"
                 params.append(expense_status)
-            q += " ORDER BY e.start_date DESC"
+            q += " ORDER BY e.start_date"
             df_expenses = pd.read_sql(q, conn, params=params)
             total_cost = 0
             if not df_expenses.empty:
                 df_expenses["start_date"] = pd.to_datetime(df_expenses["start_date"], errors="coerce")
-                df_expenses = df_expenses.sort_values("start_date")
                 total_cost = df_expenses["amount"].sum()
-                df_expenses[T("cumulative_value")] = df_expenses["amount"].cumsum()
+                df_expenses[T("cumulative_value")] = np.cumsum(df_expenses["amount"].to_numpy(dtype=np.float64))
                 rename_map = {
                     "supplier": T("supplier_name"),
                     "type": T("expense_type"),
@@ -296,40 +400,24 @@ def render(conn, T):
             st.markdown(f"**{T('total_expense_amount')}: ₪ {total_cost:,.0f}**")
 
     with tabs[2]:
-        months = pd.date_range(start_dt, end_dt, freq="MS")
-        data = []
-        cumulative = 0
-        for m in months:
-            m_start = m.date()
-            m_end = (m + pd.offsets.MonthEnd(0)).date()
-            summ = get_financial_summary_range(
-                conn, m_start, m_end, selected_building_id, exclude_apartment_0=True
-            )
-            paid_m = summ.at[0, "total_paid"]
-            expected_m = summ.at[0, "total_expected"]
-            expenses_df = get_expense_details_range(
-                conn, m_start, m_end, selected_building_id
-            )
-            exp_paid = expenses_df[expenses_df["status"] == "paid"]["cost"].sum()
-            exp_pending = expenses_df[expenses_df["status"] == "pending"]["cost"].sum()
-            special_m = get_special_transactions_balance(
-                conn, m_start, m_end, selected_building_id
-            )
-            net = expected_m + special_m - exp_paid - exp_pending
-            cumulative += net
-            data.append(
-                {
-                    "Date": m,
-                    "Month": m.strftime("%b %Y"),
-                    "Paid In": expected_m,
-                    "Paid Out": exp_paid,
-                    T("special_transactions"): special_m,
-                    "Net": net,
-                    "Cumulative": cumulative,
-                }
-            )
+        month_labels = in_range.index.strftime("%b %Y")
 
-        df_cf = pd.DataFrame(data).sort_values("Date")
+        net = (
+            in_range["exclude0_expected"]
+            + in_range["special_balance"]
+            - in_range["expenses_paid"]
+            - in_range["expenses_pending"]
+        )
+        df_cf = pd.DataFrame(
+            {
+                "Month": month_labels,
+                "Paid In": in_range["exclude0_expected"].to_numpy(),
+                "Paid Out": in_range["expenses_paid"].to_numpy(),
+                T("special_transactions"): in_range["special_balance"].to_numpy(),
+                "Net": net.to_numpy(),
+                "Cumulative": net.cumsum().to_numpy(),
+            }
+        )
         rename_map = {
             "Month": T("month"),
             "Paid In": T("paid_in_label"),
@@ -337,7 +425,7 @@ def render(conn, T):
             "Net": T("monthly_net_label").split()[0],
             "Cumulative": T("cumulative_net_label"),
         }
-        st.dataframe(df_cf.drop(columns="Date").rename(columns=rename_map))
+        st.dataframe(df_cf.rename(columns=rename_map))
 
         # ----- Cash Flow Chart Matching Dashboard Behavior -----
         baseline_value = st.selectbox(
@@ -345,107 +433,51 @@ def render(conn, T):
         )
 
         # Historical cumulative before selected range
-        base_cumulative = 0
-        for i in range(100):
-            ref_date = start_dt - pd.DateOffset(months=i + 1)
-            month_start = ref_date.date()
-            month_end = (
-                ref_date + pd.DateOffset(months=1) - pd.DateOffset(days=1)
-            ).date()
-            summ = get_financial_summary_range(
-                conn, month_start, month_end, selected_building_id, False
-            )
-            paid_hist = summ.at[0, "total_paid"]
-            expected_hist = summ.at[0, "total_expected"]
-            exp_df_hist = get_expense_details_range(
-                conn, month_start, month_end, selected_building_id
-            )
-            exp_paid_hist = exp_df_hist[exp_df_hist["status"] == "paid"]["cost"].sum()
-            exp_pending_hist = exp_df_hist[exp_df_hist["status"] == "pending"]["cost"].sum()
-            special_hist = get_special_transactions_balance(
-                conn, month_start, month_end, selected_building_id
-            )
-            if (
-                expected_hist == 0
-                and exp_paid_hist == 0
-                and exp_pending_hist == 0
-                and special_hist == 0
-            ):
-                break
-            base_cumulative += expected_hist + special_hist - exp_paid_hist - exp_pending_hist
+        base_cumulative = _cached_prior_net(conn, start_dt, selected_building_id)
 
+        chart_expenses = in_range["expenses_paid"] + in_range["expenses_pending"]
         chart_data = {
-            "Month": [],
-            "Net": [],
-            "Paid": [],
-            "Expenses": [],
-            "Special": [],
+            "Month": month_labels,
+            "Net": (in_range["total_expected"] + in_range["special_balance"] - chart_expenses).to_numpy(),
+            "Paid": in_range["total_expected"].to_numpy(),
+            "Expenses": chart_expenses.to_numpy(),
+            "Special": in_range["special_balance"].to_numpy(),
         }
-        for m in months:
-            m_start = m.date()
-            m_end = (m + pd.offsets.MonthEnd(0)).date()
-            summ = get_financial_summary_range(
-                conn, m_start, m_end, selected_building_id, False
-            )
-            paid = summ.at[0, "total_paid"]
-            expected = summ.at[0, "total_expected"]
-            exp_df = get_expense_details_range(
-                conn, m_start, m_end, selected_building_id
-            )
-            exp_paid = exp_df[exp_df["status"] == "paid"]["cost"].sum()
-            exp_pending = exp_df[exp_df["status"] == "pending"]["cost"].sum()
-            special = get_special_transactions_balance(
-                conn, m_start, m_end, selected_building_id
-            )
-            net = expected + special - exp_paid - exp_pending
-            chart_data["Month"].append(m.strftime("%b %Y"))
-            chart_data["Net"].append(net)
-            chart_data["Paid"].append(expected)
-            chart_data["Expenses"].append(exp_paid + exp_pending)
-            chart_data["Special"].append(special)
 
         df_chart = pd.DataFrame(chart_data)
         df_chart["Cumulative Net"] = df_chart["Net"].cumsum() + base_cumulative
 
         # Forecast next 6 months
-        forecast_months = [df_chart["Month"].iloc[-1]]
-        forecast_values = [df_chart["Cumulative Net"].iloc[-1]]
-        forecast_expenses = [0]
-        cumulative_forecast = df_chart["Cumulative Net"].iloc[-1]
-        last_month = end_dt
-        for i in range(1, 7):
-            ref_date = last_month + pd.DateOffset(months=i)
-            month_start = ref_date.date()
-            month_end = (
-                ref_date + pd.DateOffset(months=1) - pd.DateOffset(days=1)
-            ).date()
-            summary_future = get_financial_summary_range(
-                conn, month_start, month_end, selected_building_id, False
-            )
-            expected_future = summary_future.at[0, "total_expected"]
-            expenses_future = get_expense_details_range(
-                conn, month_start, month_end, selected_building_id
-            )
-            pending_future = (
-                expenses_future[expenses_future["status"] == "pending"]["cost"].sum()
-            )
-            forecast_expenses.append(pending_future)
-            cumulative_forecast += expected_future - pending_future
-            forecast_months.append(ref_date.strftime("%b %Y"))
-            forecast_values.append(cumulative_forecast)
-
+        future = monthly[monthly.index > end_dt]
+        last_cumulative = df_chart["Cumulative Net"].iloc[-1]
+        future_cumulative = (
+            future["total_expected"] - future["expenses_pending"]
+        ).cumsum() + last_cumulative
         df_forecast = pd.DataFrame(
-            {"Month": forecast_months, "Forecast": forecast_values, "Expenses": forecast_expenses}
+            {
+                "Month": [df_chart["Month"].iloc[-1], *future.index.strftime("%b %Y")],
+                "Forecast": [last_cumulative, *future_cumulative],
+                "Expenses": [0, *future["expenses_pending"]],
+            }
         )
 
+        # plotly is imported here so other pages do not pay for it
+        import plotly.graph_objects as go
+
+        # hover values shared by both traces, as one float array
+        chart_customdata = np.ascontiguousarray(
+            df_chart[["Paid", "Expenses", "Special"]].to_numpy(dtype=np.float64)
+        )
+        cum_text = [f"₪{val:,.0f}" for val in df_chart["Cumulative Net"]]
+
         fig = go.Figure()
         fig.add_trace(
             go.Scatter(
                 x=df_chart["Month"],
                 y=df_chart["Cumulative Net"],
-                customdata=df_chart[["Paid", "Expenses", "Special"]].values,
+                customdata=chart_customdata,
                 mode="lines+markers+text",
-                text=[f"₪{val:,.0f}" for val in df_chart["Cumulative Net"]],
+                text=cum_text,
                 textposition="top center",
                 name=T("cumulative_net_label"),
                 line=dict(color="blue", width=3),
@@ -467,7 +499,7 @@ def render(conn, T):
             go.Scatter(
                 x=df_chart["Month"],
                 y=df_chart["Net"],
-                customdata=df_chart[["Paid", "Expenses", "Special"]].values,
+                customdata=chart_customdata,
                 mode="lines+markers+text",
                 name=T("monthly_net_label"),
                 line=dict(color="orange", width=2, dash="dash"),
@@ -547,16 +579,18 @@ def render(conn, T):
 
     export_df = df_expenses if report_type == T("expenses_only") else df_trans
     if report_type == T("full_report"):
-        export_df = pd.concat([df_trans, df_expenses], axis=0)
+        export_df = pd.concat([df_trans, df_expenses], axis=0, copy=False, ignore_index=True)
     st.download_button(
         T("download_csv"),
-        export_df.to_csv(index=False).encode("utf-8-sig"),
+        _csv_bytes(export_df),
         "report.csv",
         "text/csv",
     )
 
     dl_key = f"download_summary_pdf_{st.session_state.get('download_counter', 0)}"
     if st.button(T("download_summary_pdf"), key=f"{dl_key}_generate"):
+        from modules.utils.pdf_generator import generate_report_summary_pdf
+
         pdf_bytes = generate_report_summary_pdf(
             conn,
             selected_building_id,
@@ -572,7 +606,7 @@ def render(conn, T):
                 "net": net_balance,
                 "expected_net": expected_net,
             },
-            df_half if half_year_data else pd.DataFrame(),
+            df_half,
         ).getvalue()
         st.download_button(
             T("download_summary_pdf"),
@@ -2,20 +2,19 @@
 
 import streamlit as st
 from modules.db_tools.crud_operations import add_supplier, update_supplier, delete_supplier, get_suppliers_by_building
-from modules.db_tools.filters import get_allowed_building_df
+from modules.db_tools.filters import get_allowed_building_map
 
 def render(conn, T):
     """Render supplier management for the selected building."""
     st.header("📦 " + T("supplier_management"))
 
     user_id = st.session_state.get("user_id")
-    df_buildings = get_allowed_building_df(conn)
+    building_map = get_allowed_building_map(conn)
 
-    if df_buildings.empty:
+    if not building_map:
         st.warning(T("no_buildings_assigned"))
         st.stop()
 
-    building_map = {row["building_name"]: row["building_id"] for _, row in df_buildings.iterrows()}
     selected_building_name = st.selectbox("🏢 " + T("select_building"), list(building_map.keys()))
     selected_building_id = building_map[selected_building_name]
     df_suppliers = get_suppliers_by_building(conn, selected_building_id)
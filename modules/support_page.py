@@ -5,8 +5,9 @@ from modules.db_tools.crud_operations import (
     get_user_building_ids,
     submit_ticket,
     get_support_tickets_by_buildings,
+    Ticket,
 )
-from modules.gpt_assistant import ask_gpt
+from modules.gpt_assistant import ask_gpt_stream
 
 
 def render(conn, T):
@@ -21,15 +22,12 @@ def render(conn, T):
     # Get user and building info
     username = st.session_state.get("username")
     user_id = get_user_id(conn, username)
-    building_ids = get_user_building_ids(conn, user_id)
+    building_ids = sorted(get_user_building_ids(conn, user_id))
 
     st.subheader("📋 " + T("support_tickets"))
     tickets = get_support_tickets_by_buildings(conn, building_ids)
     if tickets:
-        df_tickets = pd.DataFrame(
-            tickets,
-            columns=["ticket_id", "building_name", "subject", "status", "created_at"],
-        )
+        df_tickets = pd.DataFrame(tickets, columns=Ticket._fields)
         rename_map = {
             "ticket_id": "ID",
             "building_name": T("building_name_label") if T("building_name_label") != "building_name_label" else "Building",
@@ -49,9 +47,7 @@ def render(conn, T):
         query = st.text_input(T("ask_gpt"), key="support_gpt_input")
         if st.button(T("ask_gpt"), key="support_gpt_btn") and query:
             ctx = {"page": "support", "user": username, "buildings": str(building_ids)}
-            with st.spinner(T("thinking")):
-                answer = ask_gpt(query, ctx)
-            st.write(answer)
+            st.write_stream(ask_gpt_stream(query, ctx))
 
         if st.button("❌ Still Need Help?", key="need_help_btn"):
             st.session_state.show_ticket_form = True
@@ -1,4 +1,6 @@
 """Translation dictionaries and helpers."""
+import functools
+
 translations = {
     "en": {
         "dashboard": "Dashboard",
@@ -97,6 +99,7 @@ translations = {
         "send_selected_invoices": "Send Selected Invoices",
         "please_select_apartment": "Please select at least one apartment.",
         "invoices_sent_success": "{count} invoice(s) sent successfully.",
+        "invoice_send_failed": "Failed to send the invoice for apartment {apartment}: {error}",
         "no_paid_transactions": "No paid transactions found for the selected filters.",
         "paid_transactions": "Paid Transactions",
         "transactions_management": "Transactions Management",
@@ -195,6 +198,7 @@ translations = {
         "import_expenses_success": "✅ {count} expenses imported.",
         "some_expenses_skipped": "⚠️ Some expenses were skipped:",
         "filter_by_receipt_id": "🔍 Filter by Receipt ID",
+        "apply_filter": "Filter",
         "view_expenses_table": "📊 View Expenses Table",
         "building_id_label": "Building ID",
         "supplier_receipt_label": "Receipt",
@@ -319,6 +323,7 @@ translations = {
         "bulk_add_apartments_desc": "Add a range of apartments and assign them to floors automatically.",
         "from_apartment_number": "🔢 From Apartment Number",
         "to_apartment_number": "🔢 To Apartment Number",
+        "end_apartment_before_start": "The last apartment number must not be lower than the first.",
         "starting_floor": "🏢 Starting Floor",
         "apartments_per_floor": "📐 Apartments Per Floor",
         "submit_bulk_apartments": "➕ Submit Bulk Apartments",
@@ -367,6 +372,7 @@ translations = {
         "step4_instruction": "Fill in renter and owner information for each apartment.",
         "residents_added_for": "✅ Residents for {apt_label} added.",
         "summary_table_title": "🧾 Summary Table",
+        "table_rows_truncated": "Showing {shown} of {total} rows.",
         "residents_step_completed": "✅ Residents step completed.",
         "set_active_residents_title": "who lives here ?",
         "step5_instruction": "Select the resident currently occupying each apartment to mark them active.",
@@ -411,6 +417,7 @@ translations = {
         "building_contact_info_title": "📞 Building Contact Info",
         "save_changes_btn": "💾 Save Changes",
         "profile_updated": "✅ Profile and building contacts updated.",
+        "hashing": "Securing password...",
         "failed_to_update": "❌ Failed to update: {error}",
         "invoice_footer_preview": "🧾 Invoice Footer Preview",
         "in_building_footer_preview": "In building <u>{name}</u> this will appear as:",
@@ -541,6 +548,7 @@ translations = {
         "send_selected_invoices": "שלח חשבוניות נבחרות",
         "please_select_apartment": "אנא בחר לפחות דירה אחת.",
         "invoices_sent_success": "{count} חשבוניות נשלחו בהצלחה.",
+        "invoice_send_failed": "שליחת החשבונית לדירה {apartment} נכשלה: {error}",
         "no_paid_transactions": "לא נמצאו תשלומים עבור הסינון שנבחר.",
         "paid_transactions": "תשלומים ששולמו",
         "transactions_management": "ניהול תשלומים",
@@ -639,6 +647,7 @@ translations = {
         "import_expenses_success": "✅ יובאו {count} הוצאות.",
         "some_expenses_skipped": "⚠️ חלק מההוצאות דולגו:",
         "filter_by_receipt_id": "🔍 סינון לפי מספר קבלה",
+        "apply_filter": "סנן",
         "view_expenses_table": "📊 הצג טבלת הוצאות",
         "building_id_label": "מזהה בניין",
         "building_label": "בניין",
@@ -764,6 +773,7 @@ translations = {
         "bulk_add_apartments_desc": "הוסף טווח דירות ושייך אותן לקומות אוטומטית.",
         "from_apartment_number": "🔢 מדירת מספר",
         "to_apartment_number": "🔢 עד דירת מספר",
+        "end_apartment_before_start": "מספר הדירה האחרונה לא יכול להיות נמוך ממספר הדירה הראשונה.",
         "starting_floor": "🏢 קומה התחלתית",
         "apartments_per_floor": "📐 דירות בכל קומה",
         "submit_bulk_apartments": "➕ הוסף דירות",
@@ -812,6 +822,7 @@ translations = {
         "step4_instruction": "הזינו פרטי שוכר ובעלים לכל דירה.",
         "residents_added_for": "✅ דיירים עבור {apt_label} נוספו.",
         "summary_table_title": "🧾 טבלת סיכום",
+        "table_rows_truncated": "מוצגות {shown} מתוך {total} שורות.",
         "residents_step_completed": "✅ שלב הדיירים הושלם.",
         "set_active_residents_title": "מי מתגורר בנכס?",
         "step5_instruction": "בחרו את הדייר הפעיל בכל דירה.",
@@ -856,6 +867,7 @@ translations = {
         "building_contact_info_title": "📞 פרטי קשר לבניין",
         "save_changes_btn": "💾 שמור שינויים",
         "profile_updated": "✅ הפרופיל ופרטי יצירת הקשר בבניין עודכנו.",
+        "hashing": "מאבטח סיסמה...",
         "failed_to_update": "❌ נכשל העדכון: {error}",
         "invoice_footer_preview": "🧾 תצוגה מקדימה של כותרת חשבונית",
         "in_building_footer_preview": "בבניין <u>{name}</u> זה יופיע כך:",
@@ -892,10 +904,17 @@ translations = {
 }
 
 
+@functools.lru_cache(maxsize=8)
 def get_translation(lang):
-    """Return a translation lookup function for the given language."""
+    """Return a translation lookup function for the given language.
+
+    The English fallback is merged in once per language, so each lookup is
+    a single dict access.
+    """
+    merged = {**translations["en"], **translations.get(lang, {})}
+
     def _(key):
-        return translations.get(lang, {}).get(key, translations["en"].get(key, key))
+        return merged.get(key, key)
     return _
 
 
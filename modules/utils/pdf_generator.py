@@ -3,6 +3,7 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
+import functools
 import os
 from bidi.algorithm import get_display
 import arabic_reshaper
@@ -36,39 +37,59 @@ def maybe_rtl(text: str) -> str:
     """Apply RTL conversion if the text contains Hebrew characters."""
     return rtl(text) if contains_hebrew(text) else str(text)
 
+@functools.lru_cache(maxsize=None)
+def register_hebrew_font():
+    """Register the Hebrew font with reportlab once per process.
+
+    Call this on the script thread before rendering invoices in a worker
+    pool so the workers never register fonts concurrently.
+    """
+    font_path = os.path.join(os.path.dirname(__file__), "NotoSansHebrew-VariableFont_wdth,wght.ttf")
+    if not os.path.exists(font_path):
+        raise FileNotFoundError("Font not found at {}".format(font_path))
+    # Register the Hebrew font so Unicode text renders correctly
+    pdfmetrics.registerFont(TTFont('Hebrew', font_path))
+    pdfmetrics.registerFontFamily('Hebrew', normal='Hebrew')
+
+
+def get_invoice_building_info(conn, building_id):
+    """Return ``(building_name, representative, phone, email)`` for invoices."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT building_name, vaad_representative, contact_phone, contact_email
+            FROM buildings WHERE building_id = %s
+        """, (int(building_id),))
+        result = cur.fetchone()
+
+    if not result:
+        raise ValueError("No building found with ID {}".format(building_id))
+    return result
+
+
 """Generate a PDF receipt for a given transaction."""
 def generate_invoice_pdf(
     conn, invoice_id, resident_name, apartment, amount,
     payment_date, charge_month, building_id, payment_method,
-    output_dir=None
+    output_dir=None, lang=None, building_info=None
 ):
+    # Pass ``building_info`` from ``get_invoice_building_info`` when calling
+    # from a worker thread; ``conn`` is then not used.
     building_id = int(building_id)
     if output_dir is None:
         output_dir = os.path.join(os.path.dirname(__file__), "invoices")
-    # Language settings
-    lang = st.session_state.get("lang", "he")
+    # Language settings (pass ``lang`` explicitly when calling from a worker thread)
+    if lang is None:
+        lang = st.session_state.get("lang", "he")
     T = get_translation(lang)
     is_hebrew = lang == "he"
 
     # Load building info
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT building_name, vaad_representative, contact_phone, contact_email
-            FROM buildings WHERE building_id = %s
-        """, (building_id,))
-        result = cur.fetchone()
-
-    if not result:
-        raise ValueError("No building found with ID {}".format(building_id))
-    building_name, rep, phone, email = result
+    if building_info is None:
+        building_info = get_invoice_building_info(conn, building_id)
+    building_name, rep, phone, email = building_info
 
     # Font setup
-    font_path = os.path.join(os.path.dirname(__file__), "NotoSansHebrew-VariableFont_wdth,wght.ttf")
-    if not os.path.exists(font_path):
-        raise FileNotFoundError("Font not found at {}".format(font_path))
-    # Register the Hebrew font so Unicode text renders correctly
-    pdfmetrics.registerFont(TTFont('Hebrew', font_path))
-    pdfmetrics.registerFontFamily('Hebrew', normal='Hebrew')
+    register_hebrew_font()
 
     # File path
     os.makedirs(output_dir, exist_ok=True)